@@ -14,13 +14,43 @@ from reportlab.lib import colors
 from reportlab.lib.units import mm
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 
+import os
+import re
 import shap
 import json
 import numpy as np
 import pandas as pd
 import joblib
+import hashlib
+import shutil
+import zipfile
+import tempfile
+import uuid
+import threading
 from flask import Flask, render_template, request, Response, send_file
 import warnings
+from audit_log import AuditSink, AuditBacklogFull
+from report_cache import ReportCache, PatchedReader
+from drift_monitor import DriftMonitor
+from shared_state import StatePublisher
+from runtime_governor import RuntimeGovernor
+from score_store import PROB_COLUMNS, ScoreStore, row_fingerprints
+from shap_summary import ShapAggregator
+from result_store import ResultStore
+
+# Optional: Arrow IPC / Parquet output for batch endpoints
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Optional: faster JSON encoding (stdlib json is the fallback)
+try:
+    import orjson
+except ImportError:
+    orjson = None
 warnings.filterwarnings(
     "ignore",
     message="X has feature names, but RandomForestClassifier was fitted without feature names"
@@ -30,9 +60,21 @@ warnings.filterwarnings(
 app = Flask(__name__)
 
 
+def _json_dumps(data):
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                data,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            )
+        except (TypeError, orjson.JSONEncodeError):
+            pass
+    return json.dumps(data, cls=NumpyEncoder)
+
+
 def json_response(data, status=200):
     return Response(
-        json.dumps(data, cls=NumpyEncoder),
+        _json_dumps(data),
         status=status,
         mimetype="application/json"
     )
@@ -59,12 +101,31 @@ app.json_encoder = NumpyEncoder
 
 # ==================== Model Loading ====================
 
+MODEL_DIR = os.environ.get("LOAN_MODEL_DIR", "model")
+ENHANCED_ARTIFACT_PATH = os.path.join(MODEL_DIR, "enhanced_rf_artifact.pkl")
+BASELINE_ARTIFACT_PATH = os.path.join(MODEL_DIR, "baseline_rf_artifact.pkl")
+
+# Defaults keep routing, validation and /health working without artifacts
+DEFAULT_FEATURE_NAMES = [
+    "age", "job", "marital", "education", "default", "balance",
+    "housing", "loan", "contact", "day", "month", "duration",
+    "campaign", "pdays", "previous", "poutcome"
+]
+
 artifact = None
+baseline_artifact = None
 baseline_model = None
+rf_feature_model = None
+rf_best = None
+xgb_best = None
+blend_weight = 0.5
+feature_names = list(DEFAULT_FEATURE_NAMES)
+hybrid_feature_name = "rf_oof_proba"
+threshold = 0.5
 
 # Load enhanced model
 try:
-    artifact = joblib.load("model/enhanced_rf_artifact.pkl")
+    artifact = joblib.load(ENHANCED_ARTIFACT_PATH)
 
     rf_feature_model = artifact.get("rf_feature_model")
     rf_best = artifact["rf_best"]
@@ -81,7 +142,7 @@ except Exception as e:
 
 # Load baseline model (ALWAYS)
 try:
-    baseline_artifact = joblib.load("model/baseline_rf_artifact.pkl")
+    baseline_artifact = joblib.load(BASELINE_ARTIFACT_PATH)
     baseline_model = baseline_artifact["rf_baseline_model"]
 
     # Use same feature order
@@ -94,6 +155,51 @@ except Exception as e:
     print(f"✗ Baseline model failed: {e}")
 
 
+def _model_version(enhanced, baseline):
+    """Covers both artifacts: each contributes its explicit "model_version"
+    if set, else a file fingerprint, so replacing either one changes it."""
+    h = hashlib.sha1()
+    for data, path in ((enhanced, ENHANCED_ARTIFACT_PATH),
+                       (baseline, BASELINE_ARTIFACT_PATH)):
+        if data and data.get("model_version"):
+            h.update(f"version:{data['model_version']}".encode())
+            continue
+        try:
+            st = os.stat(path)
+            h.update(f"{path}:{st.st_size}:{int(st.st_mtime)}".encode())
+        except OSError:
+            h.update(f"{path}:missing".encode())
+    return h.hexdigest()[:12]
+
+
+MODEL_VERSION = _model_version(artifact, baseline_artifact)
+
+# Optional fast tier: one distilled model approximating the full blend
+# (see scripts/distill_model.py), used for batch screening with ?tier=fast
+DISTILLED_ARTIFACT_PATH = os.environ.get(
+    "LOAN_DISTILLED_ARTIFACT", os.path.join(MODEL_DIR, "distilled_artifact.pkl"))
+
+distilled_model = None
+if os.path.exists(DISTILLED_ARTIFACT_PATH):
+    try:
+        distilled_artifact = joblib.load(DISTILLED_ARTIFACT_PATH)
+        teacher = distilled_artifact.get("teacher_version")
+
+        # A student of another model would make decisions the served blend
+        # never would; only load it when explicitly allowed
+        if teacher != MODEL_VERSION and os.environ.get("LOAN_DISTILLED_ALLOW_MISMATCH") != "1":
+            print(f"✗ Distilled model skipped: built from model version {teacher}, "
+                  f"serving {MODEL_VERSION} (set LOAN_DISTILLED_ALLOW_MISMATCH=1 to load anyway)")
+        else:
+            distilled_model = distilled_artifact["distilled_model"]
+            if teacher != MODEL_VERSION:
+                print(f"⚠️ Distilled model from model version {teacher} loaded by override")
+            print("✓ Distilled model loaded")
+
+    except Exception as e:
+        print(f"✗ Distilled model failed: {e}")
+
+
 # ==================== Explainability (Console) ====================
 
 baseline_explainer = None
@@ -120,7 +226,7 @@ def _init_explainers():
         print(f"⚠️ SHAP explainers init failed: {e}")
 
 
-def _get_pos_class_shap(explainer, X_df):
+def _get_pos_class_shap_matrix(explainer, X_df):
     exp = explainer(X_df)
     vals = exp.values
     base = exp.base_values
@@ -150,7 +256,12 @@ def _get_pos_class_shap(explainer, X_df):
     else:
         pos_vals = vals
 
-    v = np.asarray(pos_vals[0], dtype=float)
+    return np.asarray(pos_vals, dtype=float), base
+
+
+def _get_pos_class_shap(explainer, X_df):
+    pos_vals, base = _get_pos_class_shap_matrix(explainer, X_df)
+    v = pos_vals[0]
 
     # base_values can be scalar, (n,), (n,2), (2,), etc.
     b = np.asarray(base, dtype=float)
@@ -195,44 +306,48 @@ def _shap_to_json(feature_list, shap_vals):
     abs_vals = np.abs(shap_vals)
     total = float(abs_vals.sum()) if float(abs_vals.sum()) != 0 else 1.0
 
-    rows = []
-    for f, v, a in zip(feature_list, shap_vals, abs_vals):
-        rows.append({
-            "feature": str(f),
-            "contribution": float(v),
-            "impact_percent": float((a / total) * 100.0)
-        })
-
-    rows.sort(key=lambda x: abs(x["contribution"]), reverse=True)
-    return rows
+    # tolist() yields native floats, so the JSON encoder never needs a
+    # default() fallback or a convert_numpy_types() pass
+    contributions = shap_vals.tolist()
+    impacts = ((abs_vals / total) * 100.0).tolist()
+    order = np.argsort(-abs_vals, kind="stable").tolist()
+
+    return [
+        {
+            "feature": str(feature_list[i]),
+            "contribution": contributions[i],
+            "impact_percent": impacts[i]
+        }
+        for i in order
+    ]
 
 
 # No meta feature redistribution needed in this version
+# Works on a single row (p,) or a batch of rows (n, p).
 def _redistribute_meta_feature(shap_vals, cols, base_cols, meta_col):
     shap_vals = np.asarray(shap_vals, dtype=float)
     cols = list(cols)
 
     if meta_col not in cols:
         keep_idx = [cols.index(c) for c in base_cols if c in cols]
-        return shap_vals[keep_idx]
+        return shap_vals[..., keep_idx]
 
     meta_idx = cols.index(meta_col)
 
     # indices for the 16 original/base features in the current cols
     base_idx = [cols.index(c) for c in base_cols if c in cols]
 
-    base_vals = shap_vals[base_idx].copy()
-    meta_val = float(shap_vals[meta_idx])
+    base_vals = shap_vals[..., base_idx].copy()
+    meta_val = shap_vals[..., meta_idx:meta_idx + 1]
 
     # distribute meta influence proportional to absolute base influence
     weights = np.abs(base_vals)
-    total = float(weights.sum())
+    total = weights.sum(axis=-1, keepdims=True)
 
-    if total <= 0:
-        # fallback: equal distribution if all base contributions are ~0
-        weights = np.ones_like(base_vals, dtype=float) / max(len(base_vals), 1)
-    else:
-        weights = weights / total
+    # fallback: equal distribution if all base contributions are ~0
+    equal = np.full_like(base_vals, 1.0 / max(base_vals.shape[-1], 1))
+    weights = np.where(total > 0, weights / np.where(total > 0, total, 1.0),
+                       equal)
 
     # add redistributed meta contribution (keeps sign of meta_val)
     base_vals = base_vals + (meta_val * weights)
@@ -261,6 +376,23 @@ def _impact_to_100(items):
 _init_explainers()
 
 
+# ==================== Runtime Governance ====================
+
+runtime = RuntimeGovernor()
+runtime.configure_models({
+    "rf_feature_model": rf_feature_model,
+    "rf_best": rf_best,
+    "xgb_best": xgb_best,
+    "baseline_model": baseline_model,
+    "distilled_model": distilled_model,
+})
+
+# SHAP explainers are shared across request threads; serialize their calls
+baseline_explainer = runtime.guard("baseline", baseline_explainer)
+enhanced_rf_explainer = runtime.guard("enhanced_rf", enhanced_rf_explainer)
+enhanced_xgb_explainer = runtime.guard("enhanced_xgb", enhanced_xgb_explainer)
+
+
 # ==================== Helper Functions ====================
 
 
@@ -380,69 +512,200 @@ VALUE_MAP = {
 }
 
 
+# Extra spellings accepted for raw-label input (matches the CSV reader)
+LABEL_ALIASES = {
+    "job": {"admin.": 0},
+    "month": {
+        "jan": 4, "feb": 3, "mar": 7, "apr": 0, "jun": 6, "jul": 5,
+        "aug": 1, "sep": 11, "sept": 11, "oct": 10, "nov": 9, "dec": 2
+    },
+}
+
+
+def _build_label_tables():
+    """Inverse of VALUE_MAP: normalized label -> code, per feature."""
+    tables = {}
+    for key, codes in VALUE_MAP.items():
+        table = {label.lower(): code for code, label in codes.items()}
+        table.update(LABEL_ALIASES.get(key, {}))
+        tables[key] = table
+    return tables
+
+
+def _build_display_tables():
+    """code, "code" or normalized label -> display label, per feature."""
+    tables = {}
+    for key, codes in VALUE_MAP.items():
+        table = {}
+        for label_norm, code in LABEL_TABLES[key].items():
+            table[label_norm] = codes[code]
+        for code, label in codes.items():
+            table[code] = label
+            table[str(code)] = label
+        tables[key] = table
+    return tables
+
+
+LABEL_TABLES = _build_label_tables()
+DISPLAY_TABLES = _build_display_tables()
+
+
+def _encode_labels(series, table):
+    """Map raw text labels to codes; unknown labels become NaN.
+
+    Normalization and lookup run once per distinct label (categorical
+    dtype), not once per row.
+    """
+    cat = series.astype("category")
+    lookup = cat.cat.categories.astype(str).str.strip().str.lower() \
+        .map(table).to_numpy(dtype=float)
+    codes = cat.cat.codes.to_numpy()
+    return np.where(codes >= 0, lookup[codes], np.nan)
+
+
 def _display_input_value(key, raw):
     if raw is None or raw == "":
         return ""
 
-    try:
-        n = int(raw)
-    except:
-        return str(raw)
-
-    m = VALUE_MAP.get(key)
-    if not m:
+    table = DISPLAY_TABLES.get(key)
+    if table is None:
         return str(raw)
 
-    return m.get(n, str(raw))
+    if isinstance(raw, str):
+        hit = table.get(raw.strip().lower())
+    else:
+        hit = table.get(raw)
 
+    return hit if hit is not None else str(raw)
 
-def _run_inference_and_explain(data):
-    df = pd.DataFrame([data])
 
-    missing = [f for f in feature_names if f not in df.columns]
-    if missing:
-        raise ValueError("Missing required fields: " + ", ".join(missing))
+# ==================== Input Schema ====================
 
-    df = df[feature_names]
 
-    result = {}
-    df_hybrid = None
+def _compile_input_schema(columns):
+    """Column order and allowed category codes, built once at startup."""
+    return {
+        "columns": list(columns),
+        "categorical": {
+            name: np.asarray(sorted(VALUE_MAP[name]), dtype=float)
+            for name in columns if name in VALUE_MAP
+        },
+    }
 
-    if artifact and rf_feature_model:
-        rf_oof_proba = rf_feature_model.predict_proba(df)[:, 1]
-        df_hybrid = df.copy()
-        df_hybrid[hybrid_feature_name] = rf_oof_proba
 
-        rf_prob = float(rf_best.predict_proba(df_hybrid)[0][1])
-        xgb_prob = float(xgb_best.predict_proba(df_hybrid)[0][1])
+INPUT_SCHEMA = _compile_input_schema(feature_names)
 
-        final_prob = (blend_weight * rf_prob) + ((1 - blend_weight) * xgb_prob)
-        prediction = int(final_prob >= threshold)
 
-        result["enhanced_model"] = {
-            "loan_status": "Approved" if prediction else "Rejected",
-            "risk_percentage": round((100 - (final_prob * 100)), 2),
-            "rf_probability": round(rf_prob * 100, 2),
-            "xgb_probability": round(xgb_prob * 100, 2),
-            "confidence_score": round(max(final_prob, 1 - final_prob) * 100, 2),
-            "model_type": "enhanced_blend"
-        }
+def _validate_rows(rows, schema=None):
+    """Validate and coerce a batch of row dicts (or a raw DataFrame, e.g.
+    a parsed CSV) in one vectorized pass. Categorical columns accept either
+    VALUE_MAP codes or their text labels ("management", "May").
 
-    if baseline_model:
-        baseline_prob = float(baseline_model.predict_proba(df)[0][1])
-        baseline_pred = int(baseline_model.predict(df)[0])
+    Returns (df, ok, errors): df is a float64 frame in model column order
+    with NaN for unusable cells, ok masks the rows that can be scored and
+    errors holds a message per row ("" if ok).
+    """
+    schema = schema or INPUT_SCHEMA
+    columns = schema["columns"]
+    categorical = schema["categorical"]
 
-        result["baseline_model"] = {
-            "loan_status": "Approved" if baseline_pred else "Rejected",
-            "risk_percentage": round((100 - (baseline_prob * 100)), 2),
-            "rf_probability": round(baseline_prob * 100, 2),
-            "confidence_score": round(max(baseline_prob, 1 - baseline_prob) * 100, 2),
-            "model_type": "baseline_rf"
-        }
+    if isinstance(rows, pd.DataFrame):
+        raw = rows.reindex(columns=columns)
+    else:
+        records = [r if isinstance(r, dict) else {} for r in rows]
+        raw = pd.DataFrame.from_records(records, columns=columns)
+
+    n, p = raw.shape
+    X = np.empty((n, p), dtype=float)
+    missing = np.zeros((n, p), dtype=bool)
+    invalid = np.zeros((n, p), dtype=bool)
+    out_of_range = np.zeros((n, p), dtype=bool)
+
+    for j, name in enumerate(columns):
+        col = raw[name]
+        is_text = not pd.api.types.is_numeric_dtype(col)
+
+        absent = col.isna().to_numpy(dtype=bool, copy=True)
+        scalar = np.ones(n, dtype=bool)
+        if is_text:
+            absent |= col.map(
+                lambda v: isinstance(v, str) and not v.strip()).to_numpy(bool)
+            # JSON lists / objects are invalid cells, never labels (they
+            # are unhashable and would break the categorical lookup)
+            scalar = col.map(
+                lambda v: v is None or isinstance(v, (str, int, float, np.number))
+            ).to_numpy(bool)
+
+        values = pd.to_numeric(col.where(scalar), errors="coerce").to_numpy(
+            dtype=float, copy=True)
+
+        labels = LABEL_TABLES.get(name)
+        if labels is not None and is_text:
+            unresolved = np.isnan(values) & ~absent & scalar
+            if unresolved.any():
+                values[unresolved] = _encode_labels(col[unresolved], labels)
+
+        bad = ~np.isfinite(values) & ~absent
+
+        codes = categorical.get(name)
+        if codes is not None:
+            out_of_range[:, j] = ~absent & ~bad & ~np.isin(values, codes)
+
+        X[:, j] = values
+        missing[:, j] = absent
+        invalid[:, j] = bad
+
+    rejected = missing | invalid | out_of_range
+    ok = ~rejected.any(axis=1)
+    X[rejected] = np.nan
+
+    errors = [""] * n
+    for i in np.flatnonzero(~ok):
+        parts = []
+        if missing[i].any():
+            parts.append("Missing required fields: " + ", ".join(
+                columns[j] for j in np.flatnonzero(missing[i])))
+        if invalid[i].any():
+            parts.append("Invalid values for: " + ", ".join(
+                columns[j] for j in np.flatnonzero(invalid[i])))
+        if out_of_range[i].any():
+            parts.append("Unknown category codes for: " + ", ".join(
+                columns[j] for j in np.flatnonzero(out_of_range[i])))
+        errors[i] = "; ".join(parts)
+
+    return pd.DataFrame(X, columns=columns), ok, errors
+
+
+def _decision_labels(scores):
+    # Enhanced blend decides when loaded, otherwise the baseline model
+    decision = scores.get("decision", scores.get("baseline_decision"))
+    if decision is None:
+        return None
+    return np.where(decision == 1, "Approved", "Rejected")
+
+
+def _run_inference_and_explain(data, source=None):
+    result, df, scores = _infer_row(data)
+
+    if source:
+        _observe_scored(source, df, scores)
+
+    return result, df
+
+
+def _infer_row(data):
+    """Score and explain a single row; returns (result, df, scores)."""
+    df, ok, errors = _validate_rows([data])
+    if not ok[0]:
+        raise ValueError(errors[0])
+
+    scores, df_hybrid = _score_frame(df)
+    result = _model_results(scores)
 
     if shap is not None:
         if baseline_model and baseline_explainer is not None:
             b_vals, _ = _get_pos_class_shap(baseline_explainer, df)
+            _observe_shap({"baseline_shap": b_vals})
             items = _shap_to_json(feature_names, b_vals)
             items = _impact_to_100(items)
             result["baseline_explainability"] = {
@@ -462,6 +725,7 @@ def _run_inference_and_explain(data):
 
             blend_16 = (blend_weight * np.asarray(rf_16)) + \
                 ((1 - blend_weight) * np.asarray(xgb_16))
+            _observe_shap({"enhanced_shap": blend_16})
             items_16 = _shap_to_json(feature_names, blend_16)
             items_16 = _impact_to_100(items_16)
 
@@ -471,15 +735,827 @@ def _run_inference_and_explain(data):
                 "items": items_16
             }
 
-    return convert_numpy_types(result), df
+    return result, df, scores
+
+
+# ==================== Audit Log ====================
+
+AUDIT_ENABLED = os.environ.get("LOAN_AUDIT", "1") != "0"
+
+audit_sink = None
+if AUDIT_ENABLED:
+    audit_sink = AuditSink(
+        os.environ.get("LOAN_AUDIT_DIR", "audit"),
+        INPUT_SCHEMA["columns"],
+        fmt=os.environ.get("LOAN_AUDIT_FORMAT", "sqlite"),
+        max_pending_rows=int(os.environ.get("LOAN_AUDIT_MAX_PENDING", "200000")),
+        block_timeout=float(os.environ.get("LOAN_AUDIT_BLOCK_SECONDS", "30"))
+    )
+
+
+def _audit(source, X, scores):
+    """Queue scored rows for the audit log. Only blocks when the buffer is
+    full; a backlog that does not drain fails the request."""
+    if audit_sink is None:
+        return
+    try:
+        audit_sink.record(
+            source,
+            np.asarray(X, dtype=float),
+            scores,
+            threshold=threshold if artifact else None,
+            model_version=MODEL_VERSION
+        )
+    except AuditBacklogFull:
+        raise
+    except Exception as e:
+        print(f"⚠️ Audit record failed: {e}")
+
+
+# ==================== Drift Monitoring ====================
+
+# Worker processes publish their monitoring state here; the monitoring
+# endpoints merge all of them (see shared_state.py). RUN_ID is fixed at
+# import, i.e. in the gunicorn master under serve.py.
+MONITOR_SHARED = os.environ.get("LOAN_MONITOR_SHARED", "1") != "0"
+MONITOR_DIR = os.environ.get("LOAN_MONITOR_DIR", os.path.join("cache", "monitoring"))
+MONITOR_PUBLISH_SECONDS = float(os.environ.get("LOAN_MONITOR_PUBLISH_SECONDS", "2"))
+RUN_ID = os.environ.get("LOAN_RUN_ID") or uuid.uuid4().hex[:12]
+
+
+def _state_publisher(kind, state_fn):
+    if not MONITOR_SHARED:
+        return None
+    try:
+        return StatePublisher(MONITOR_DIR, kind, RUN_ID, state_fn,
+                              interval=MONITOR_PUBLISH_SECONDS)
+    except Exception as e:
+        print(f"⚠️ Shared {kind} state disabled: {e}")
+        return None
+
+
+DRIFT_BASELINE_PATH = os.environ.get(
+    "LOAN_DRIFT_BASELINE", os.path.join(MODEL_DIR, "drift_baseline.json"))
+
+
+def _init_drift_monitor():
+    baseline = None
+    if os.path.exists(DRIFT_BASELINE_PATH):
+        try:
+            baseline = DriftMonitor.load_baseline(DRIFT_BASELINE_PATH)
+            print("✓ Drift baseline loaded")
+        except Exception as e:
+            print(f"⚠️ Drift baseline failed: {e}")
+
+    return DriftMonitor(
+        INPUT_SCHEMA["columns"],
+        {name: VALUE_MAP[name] for name in INPUT_SCHEMA["categorical"]},
+        threshold=threshold if artifact else 0.5,
+        baseline=baseline
+    )
+
+
+drift_monitor = _init_drift_monitor()
+drift_publisher = _state_publisher("drift", drift_monitor.state)
+
+
+def _observe_scored(source, X, scores):
+    """Every scored row goes to the audit log and the drift statistics."""
+    _audit(source, X, scores)
+    try:
+        drift_monitor.update(
+            np.asarray(X, dtype=float),
+            scores.get("final_prob", scores.get("baseline_prob"))
+        )
+        if drift_publisher is not None:
+            drift_publisher.mark_dirty()
+    except Exception as e:
+        print(f"⚠️ Drift update failed: {e}")
+
+
+# ==================== SHAP Summary ====================
+
+SHAP_SUMMARY_ENABLED = os.environ.get("LOAN_SHAP_SUMMARY", "1") != "0"
+SHAP_SUMMARY_TOP = 10
+# Batches scored without SHAP feed the summary from a random sample of at
+# most this many rows each (0 disables)
+SHAP_SAMPLE_ROWS = int(os.environ.get("LOAN_SHAP_SAMPLE_ROWS", "200"))
+
+shap_summary = ShapAggregator(feature_names) if SHAP_SUMMARY_ENABLED else None
+shap_publisher = _state_publisher("shap", shap_summary.state) if shap_summary else None
+
+
+def _observe_shap(shap_out):
+    """Fold freshly computed SHAP values (16-feature space) into the summary."""
+    if shap_summary is None:
+        return
+    try:
+        for key, name in (("baseline_shap", "baseline"), ("enhanced_shap", "enhanced")):
+            if key in shap_out:
+                shap_summary.update(name, shap_out[key])
+        if shap_publisher is not None:
+            shap_publisher.mark_dirty()
+    except Exception as e:
+        print(f"⚠️ SHAP summary update failed: {e}")
+
+
+# ==================== Batch Scoring ====================
+
+
+def _score_frame(df, with_baseline=True):
+    """Score every row of a validated feature frame in one pass per model.
+
+    Returns (scores, df_hybrid) where scores maps names to 1-D arrays.
+    """
+    with runtime.scoring():
+        return _score_models(df, with_baseline)
+
+
+def _score_models(df, with_baseline):
+    scores = {}
+    df_hybrid = None
+
+    if artifact and rf_feature_model:
+        df_hybrid = df.copy()
+        df_hybrid[hybrid_feature_name] = rf_feature_model.predict_proba(df)[
+            :, 1]
+
+        rf_prob = rf_best.predict_proba(df_hybrid)[:, 1]
+        xgb_prob = xgb_best.predict_proba(df_hybrid)[:, 1]
+        final_prob = (blend_weight * rf_prob) + ((1 - blend_weight) * xgb_prob)
+
+        scores["rf_prob"] = rf_prob
+        scores["xgb_prob"] = xgb_prob
+        scores["final_prob"] = final_prob
+        scores["decision"] = (final_prob >= threshold).astype(np.int8)
+
+    if baseline_model and with_baseline:
+        # predict() is argmax over predict_proba(); reuse the single pass
+        proba = baseline_model.predict_proba(df)
+        pred = baseline_model.classes_.take(np.argmax(proba, axis=1))
+
+        scores["baseline_prob"] = proba[:, 1]
+        scores["baseline_decision"] = pred.astype(np.int8)
+
+    return scores, df_hybrid
+
+
+def _score_frame_fast(df):
+    """Distilled single-model scoring; same keys as the blend's final_prob."""
+    with runtime.scoring():
+        logits = distilled_model.predict(df)
+    final_prob = 1.0 / (1.0 + np.exp(-logits))
+
+    return {
+        "final_prob": final_prob,
+        "decision": (final_prob >= threshold).astype(np.int8),
+    }
+
+
+# ==================== Cascade Scoring ====================
+
+CASCADE_BAND = float(os.environ.get("LOAN_CASCADE_BAND", "0.1"))
+
+cascade_stats = {"batches": 0, "rows": 0, "resolved_fast": 0, "escalated": 0}
+_cascade_lock = threading.Lock()
+
+
+def _score_frame_cascade(df, band=CASCADE_BAND):
+    """Cheap model first; only rows within `band` of the threshold go on
+    to the full rf_feature_model -> rf_best + xgb_best blend.
+
+    Returns (scores, df_hybrid, escalated): df_hybrid covers only the
+    escalated rows and scores["tier"] is 0 (fast) or 1 (full) per row.
+    """
+    scores = {}
+    if distilled_model is not None:
+        fast_prob = _score_frame_fast(df)["final_prob"]
+    else:
+        # The baseline forest doubles as the fast tier
+        with runtime.scoring():
+            proba = baseline_model.predict_proba(df)
+        pred = baseline_model.classes_.take(np.argmax(proba, axis=1))
+        scores["baseline_prob"] = proba[:, 1]
+        scores["baseline_decision"] = pred.astype(np.int8)
+        fast_prob = proba[:, 1]
+
+    escalated = np.abs(fast_prob - threshold) <= band
+    n = len(fast_prob)
+
+    final_prob = fast_prob.astype(float).copy()
+    rf_prob = np.full(n, np.nan)
+    xgb_prob = np.full(n, np.nan)
+
+    df_hybrid = None
+    if escalated.any() and artifact and rf_feature_model:
+        full, df_hybrid = _score_frame(df[escalated], with_baseline=False)
+        final_prob[escalated] = full["final_prob"]
+        rf_prob[escalated] = full["rf_prob"]
+        xgb_prob[escalated] = full["xgb_prob"]
+
+    scores.update({
+        "rf_prob": rf_prob,
+        "xgb_prob": xgb_prob,
+        "final_prob": final_prob,
+        "decision": (final_prob >= threshold).astype(np.int8),
+        "tier": escalated.astype(np.int8),
+    })
+
+    with _cascade_lock:
+        cascade_stats["batches"] += 1
+        cascade_stats["rows"] += n
+        cascade_stats["escalated"] += int(escalated.sum())
+        cascade_stats["resolved_fast"] += n - int(escalated.sum())
+
+    return scores, df_hybrid, escalated
+
+
+# ==================== Incremental Scoring ====================
+
+SCORE_STORE_ENABLED = os.environ.get("LOAN_SCORE_STORE", "1") != "0"
+SCORE_STORE_PATH = os.environ.get(
+    "LOAN_SCORE_STORE_PATH", os.path.join("cache", "scores.sqlite"))
+# Opt-in: importing app (scripts, dry runs) must not delete stored scores
+SCORE_STORE_PURGE = os.environ.get("LOAN_SCORE_STORE_PURGE", "0") == "1"
+
+
+def _purge_score_store(store):
+    """Drop rows of other model versions and close the connection, so no
+    SQLite handle is inherited by forked workers. Refused while a model is
+    missing: MODEL_VERSION is then a fingerprint of absent files."""
+    try:
+        if artifact is None or baseline_model is None:
+            print("⚠️ Score store purge skipped: models not loaded")
+            return 0
+        purged = store.purge_other_versions(MODEL_VERSION)
+        print(f"✓ Score store: dropped {purged} rows of other model versions")
+        return purged
+    finally:
+        store.close()
+
+
+score_store = None
+if SCORE_STORE_ENABLED:
+    try:
+        score_store = ScoreStore(SCORE_STORE_PATH)
+        if SCORE_STORE_PURGE:
+            _purge_score_store(score_store)
+        print(f"✓ Score store at {SCORE_STORE_PATH}")
+    except Exception as e:
+        print(f"⚠️ Score store disabled: {e}")
+        score_store = None
+
+
+def _score_frame_incremental(df):
+    """Score only rows whose fingerprint is not in the score store.
+
+    Returns (scores, df_hybrid, rescored): df_hybrid covers only the
+    rescored rows, the rest are served from the store.
+    """
+    # Same keys _score_frame() would have produced for the loaded models
+    keys = []
+    if artifact and rf_feature_model:
+        keys += ["rf_prob", "xgb_prob", "final_prob", "decision"]
+    if baseline_model:
+        keys += ["baseline_prob", "baseline_decision"]
+
+    fps = row_fingerprints(df)
+    hit, stored = score_store.lookup(MODEL_VERSION, fps)
+    # A stored row lacking a score of a loaded model is scored again
+    for name in keys:
+        if name in PROB_COLUMNS:
+            hit &= ~np.isnan(stored[name])
+    rescored = ~hit
+
+    df_hybrid = None
+    if rescored.any():
+        fresh, df_hybrid = _score_frame(df[rescored])
+        # Nothing scored (no model loaded): keep NULL rows out of the store
+        if fresh:
+            score_store.put(MODEL_VERSION, fps[rescored], fresh)
+        for name, values in fresh.items():
+            stored[name][rescored] = values
+
+    scores = {name: stored[name] for name in keys}
+
+    return scores, df_hybrid, rescored
+
+
+def _model_results(scores, i=0):
+    """Per-model result dicts for row i of _score_frame() output."""
+    result = {}
+
+    if "final_prob" in scores:
+        rf_prob = float(scores["rf_prob"][i])
+        xgb_prob = float(scores["xgb_prob"][i])
+        final_prob = float(scores["final_prob"][i])
+        prediction = int(scores["decision"][i])
+
+        result["enhanced_model"] = {
+            "loan_status": "Approved" if prediction else "Rejected",
+            "risk_percentage": round((100 - (final_prob * 100)), 2),
+            "rf_probability": round(rf_prob * 100, 2),
+            "xgb_probability": round(xgb_prob * 100, 2),
+            "confidence_score": round(max(final_prob, 1 - final_prob) * 100, 2),
+            "model_type": "enhanced_blend"
+        }
+
+    if "baseline_prob" in scores:
+        baseline_prob = float(scores["baseline_prob"][i])
+        baseline_pred = int(scores["baseline_decision"][i])
+
+        result["baseline_model"] = {
+            "loan_status": "Approved" if baseline_pred else "Rejected",
+            "risk_percentage": round((100 - (baseline_prob * 100)), 2),
+            "rf_probability": round(baseline_prob * 100, 2),
+            "confidence_score": round(max(baseline_prob, 1 - baseline_prob) * 100, 2),
+            "model_type": "baseline_rf"
+        }
+
+    return result
+
+
+def _explain_frame(df, df_hybrid, with_baseline=True):
+    """SHAP matrices (n, 16) for the baseline and the final enhanced blend."""
+    shap_out = {}
+    if shap is None:
+        return shap_out
+
+    if with_baseline and baseline_model and baseline_explainer is not None:
+        b_vals, _ = _get_pos_class_shap_matrix(baseline_explainer, df)
+        shap_out["baseline_shap"] = b_vals
+
+    if df_hybrid is not None and enhanced_rf_explainer is not None and enhanced_xgb_explainer is not None:
+        rf_vals, _ = _get_pos_class_shap_matrix(
+            enhanced_rf_explainer, df_hybrid)
+        xgb_vals, _ = _get_pos_class_shap_matrix(
+            enhanced_xgb_explainer, df_hybrid)
+
+        cols = list(df_hybrid.columns)
+        rf_16 = _redistribute_meta_feature(
+            rf_vals, cols, feature_names, hybrid_feature_name)
+        xgb_16 = _redistribute_meta_feature(
+            xgb_vals, cols, feature_names, hybrid_feature_name)
+
+        shap_out["enhanced_shap"] = (blend_weight * rf_16) + \
+            ((1 - blend_weight) * xgb_16)
+
+    _observe_shap(shap_out)
+    return shap_out
+
+
+def _sample_shap(df, df_hybrid):
+    """Explain a random sample of rows scored by the full models, for the
+    SHAP summary only. df and df_hybrid must hold the same rows."""
+    if shap_summary is None or SHAP_SAMPLE_ROWS <= 0 or len(df) == 0:
+        return
+    try:
+        if len(df) > SHAP_SAMPLE_ROWS:
+            pick = np.sort(np.random.default_rng().choice(
+                len(df), SHAP_SAMPLE_ROWS, replace=False))
+            df = df.iloc[pick]
+            if df_hybrid is not None:
+                df_hybrid = df_hybrid.iloc[pick]
+        _explain_frame(df, df_hybrid)
+    except Exception as e:
+        print(f"⚠️ SHAP sample failed: {e}")
+
+
+# ==================== Columnar Output ====================
+
+COLUMNAR_FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+    "npz": "application/x-npz",
+}
+
+
+def _available_columnar_formats():
+    if pa is None:
+        return ["npz"]
+    return list(COLUMNAR_FORMATS)
+
+
+def _negotiate_batch_format():
+    """Pick the response format from ?format= or the Accept header."""
+    fmt = (request.args.get("format") or "").strip().lower()
+    if fmt:
+        return fmt
+
+    offers = ["application/json"] + \
+        [COLUMNAR_FORMATS[f] for f in _available_columnar_formats()]
+    best = request.accept_mimetypes.best_match(
+        offers, default="application/json")
+
+    for name, mimetype in COLUMNAR_FORMATS.items():
+        if mimetype == best:
+            return name
+    return "json"
+
+
+def _scatter(values, ok, fill, dtype):
+    # Expand per-valid-row values back to one entry per input row
+    out = np.full((len(ok),) + values.shape[1:], fill, dtype=dtype)
+    out[ok] = values
+    return out
 
 
-def _build_pdf_bytes(result, input_data):
-    tz = ZoneInfo("Asia/Manila")
-    now = datetime.now(tz)
+def _batch_columns(ok, errors, scores, shap_out=None):
+    """Packed per-row arrays for a batch; invalid rows hold NaN / -1."""
+    cols = {
+        "ok": np.asarray(ok, dtype=bool),
+        "error": np.asarray(errors, dtype=str),
+    }
+
+    for name in ("final_prob", "rf_prob", "xgb_prob", "baseline_prob"):
+        if name in scores:
+            cols[name] = _scatter(scores[name], ok, np.nan, np.float32)
+
+    for name in ("decision", "baseline_decision", "tier"):
+        if name in scores:
+            cols[name] = _scatter(scores[name], ok, -1, np.int8)
+
+    for name, matrix in (shap_out or {}).items():
+        cols[name] = _scatter(matrix, ok, np.nan, np.float32)
+
+    return cols
+
+
+def _columnar_response(cols, fmt, status=200):
+    buff = BytesIO()
+
+    if fmt == "npz":
+        np.savez(buff, feature_names=np.asarray(feature_names, dtype=str),
+                 **cols)
+    else:
+        flat = {}
+        for name, values in cols.items():
+            if values.ndim == 2:
+                # SHAP matrices become one column per feature
+                for j, f in enumerate(feature_names):
+                    flat[f"{name}.{f}"] = values[:, j]
+            else:
+                flat[name] = values
+        table = pa.table(flat)
+
+        if fmt == "parquet":
+            pq.write_table(table, buff)
+        else:
+            with pa.ipc.new_stream(buff, table.schema) as writer:
+                writer.write_table(table)
+
+    return Response(
+        buff.getvalue(),
+        status=status,
+        mimetype=COLUMNAR_FORMATS[fmt]
+    )
+
+
+def _batch_response(rows, source="predict-batch"):
+    """Validate, score and serialize a batch (list of dicts or DataFrame)."""
+    fmt = _negotiate_batch_format()
+    if fmt != "json" and fmt not in _available_columnar_formats():
+        return json_response({
+            "error": "Unsupported format",
+            "formats": ["json"] + _available_columnar_formats()
+        }, 406)
+
+    tier = (request.args.get("tier") or os.environ.get("LOAN_BATCH_TIER", "full")).lower()
+    if tier not in ("full", "fast", "cascade"):
+        return json_response({"error": "Unknown tier", "tiers": ["full", "fast", "cascade"]}, 400)
+    if tier == "fast" and distilled_model is None:
+        return json_response({"error": "Fast tier not available (no distilled model)"}, 400)
+    if tier == "cascade" and distilled_model is None and not baseline_model:
+        return json_response({"error": "Cascade needs a distilled or baseline model"}, 400)
+
+    band = CASCADE_BAND
+    if tier == "cascade" and "band" in request.args:
+        try:
+            band = float(request.args["band"])
+        except ValueError:
+            band = np.nan
+        if not 0 <= band <= 1:
+            return json_response({"error": "band must be a number within [0, 1]"}, 400)
+
+    incremental = (request.args.get("mode") or os.environ.get("LOAN_BATCH_MODE", "")).lower() == "incremental"
+    if incremental and (tier != "full" or score_store is None):
+        return json_response({"error": "Incremental mode needs tier=full and the score store"}, 400)
+
+    # Validate everything up front, then score the valid rows in one
+    # vectorized pass (no per-row SHAP unless asked for)
+    df, ok, errors = _validate_rows(rows)
+
+    scores, df_hybrid, escalated, rescored = {}, None, None, None
+    if ok.any():
+        if incremental:
+            scores, df_hybrid, rescored = _score_frame_incremental(df[ok])
+        elif tier == "fast":
+            scores = _score_frame_fast(df[ok])
+        elif tier == "cascade":
+            scores, df_hybrid, escalated = _score_frame_cascade(df[ok], band)
+        else:
+            scores, df_hybrid = _score_frame(df[ok])
+        _observe_scored(source, df[ok], scores)
+
+    explain = (fmt != "json" and request.args.get("shap") in ("1", "true")
+               and tier != "fast")
+    if ok.any() and not explain and tier == "full":
+        # Fast and cascade tiers do not run the full models on every row,
+        # so a sample of them would not describe the portfolio
+        if rescored is not None:
+            if rescored.any():
+                _sample_shap(df[ok][rescored], df_hybrid)
+        else:
+            _sample_shap(df[ok], df_hybrid)
+
+    # Keep the per-row probabilities for /what-if, when asked to
+    job_id = None
+    keep = request.args.get("keep")
+    if keep in ("1", "true") or (JOB_SAVE_DEFAULT and keep not in ("0", "false")):
+        job_id = _save_batch_job(scores, _row_outcomes(rows, ok))
+
+    # Columnar output skips the per-row dict building entirely
+    if fmt != "json":
+        shap_out = {}
+        if explain and ok.any():
+            if rescored is not None:
+                # Incremental: only rescored rows are explained
+                if rescored.any():
+                    for name, matrix in _explain_frame(df[ok][rescored], df_hybrid).items():
+                        shap_out[name] = _scatter(matrix, rescored, np.nan, float)
+            elif escalated is None:
+                shap_out = _explain_frame(df[ok], df_hybrid)
+            elif escalated.any():
+                # Cascade: only escalated rows are explained
+                explained = _explain_frame(
+                    df[ok][escalated], df_hybrid, with_baseline=False)
+                for name, matrix in explained.items():
+                    shap_out[name] = _scatter(matrix, escalated, np.nan, float)
+
+        resp = _columnar_response(
+            _batch_columns(ok, errors, scores, shap_out), fmt)
+        if job_id:
+            resp.headers["X-Job-Id"] = job_id
+        if rescored is not None:
+            resp.headers["X-Rows-Cached"] = str(int((~rescored).sum()))
+            resp.headers["X-Rows-Scored"] = str(int(rescored.sum()))
+        return resp
+
+    labels = _decision_labels(scores)
+
+    out = []
+    valid_pos = 0
+    for is_ok, err in zip(ok, errors):
+        if not is_ok:
+            out.append({
+                "ok": False,
+                "error": err
+            })
+            continue
+
+        item = {
+            "ok": True,
+            "loan_status": str(labels[valid_pos]) if labels is not None else "None"
+        }
+        if escalated is not None:
+            item["tier"] = "full" if escalated[valid_pos] else "fast"
+        out.append(item)
+        valid_pos += 1
+
+    body = {"results": out, "tier": tier}
+    if job_id:
+        body["job_id"] = job_id
+    if incremental:
+        body["incremental"] = {
+            "cached": int((~rescored).sum()) if rescored is not None else 0,
+            "scored": int(rescored.sum()) if rescored is not None else 0,
+        }
+    return json_response(body, 200)
+
+
+def _read_uploaded_csv():
+    """Parse a CSV sent as multipart field "file" or as the raw body."""
+    upload = request.files.get("file")
+    stream = upload.stream if upload else BytesIO(request.get_data())
+
+    df = pd.read_csv(stream, skipinitialspace=True)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    return df
+
+
+# ==================== What-If Analysis ====================
+
+JOB_DIR = os.environ.get("LOAN_JOB_DIR", os.path.join("cache", "jobs"))
+JOB_KEEP = int(os.environ.get("LOAN_JOB_KEEP", "200"))
+# Saving costs an .npz write plus a prune scan per batch: opt-in per
+# request (?keep=1) unless enabled for every batch
+JOB_SAVE_DEFAULT = os.environ.get("LOAN_KEEP_JOBS", "0") == "1"
+WHAT_IF_MAX_GRID = 10000
+
+# Optional ground-truth column in uploaded rows (as in the bank dataset)
+OUTCOME_COLUMN = "deposit"
+OUTCOME_VALUES = {
+    "yes": 1, "1": 1, "1.0": 1, "true": 1,
+    "no": 0, "0": 0, "0.0": 0, "false": 0,
+}
+
+
+def _row_outcomes(rows, ok):
+    """Known outcomes (1 / 0, -1 if unknown) for the valid rows, or None."""
+    if isinstance(rows, pd.DataFrame):
+        if OUTCOME_COLUMN not in rows.columns:
+            return None
+        raw = rows[OUTCOME_COLUMN]
+    else:
+        raw = pd.Series([
+            r.get(OUTCOME_COLUMN) if isinstance(r, dict) else None
+            for r in rows
+        ], dtype=object)
+        if raw.isna().all():
+            return None
+
+    y = raw.astype(str).str.strip().str.lower().map(OUTCOME_VALUES)
+    return y.fillna(-1).to_numpy(dtype=np.int8)[ok]
+
+
+def _save_batch_job(scores, outcomes=None):
+    """Persist per-row blend inputs so decisions can be recomputed later.
+
+    Stored as .npz on local disk so any worker process can serve /what-if.
+    """
+    if "rf_prob" not in scores or "xgb_prob" not in scores:
+        return None
+    # Cascade batches leave fast-tier rows without rf/xgb probabilities
+    if not np.isfinite(scores["rf_prob"]).all():
+        return None
+
+    try:
+        os.makedirs(JOB_DIR, exist_ok=True)
+        job_id = uuid.uuid4().hex
+        arrays = {
+            "rf_prob": scores["rf_prob"],
+            "xgb_prob": scores["xgb_prob"],
+            "decision": scores["decision"],
+            "meta": np.asarray(json.dumps({
+                "model_version": MODEL_VERSION,
+                "threshold": float(threshold),
+                "blend_weight": float(blend_weight),
+            })),
+        }
+        if outcomes is not None:
+            arrays["outcome"] = outcomes
+
+        tmp = os.path.join(JOB_DIR, job_id + ".tmp.npz")
+        np.savez(tmp, **arrays)
+        os.replace(tmp, os.path.join(JOB_DIR, job_id + ".npz"))
+
+        _prune_batch_jobs()
+        return job_id
+    except Exception as e:
+        print(f"⚠️ Batch job save failed: {e}")
+        return None
+
+
+def _prune_batch_jobs():
+    entries = [e for e in os.scandir(JOB_DIR) if e.name.endswith(".npz")]
+    if len(entries) <= JOB_KEEP:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for e in entries[:len(entries) - JOB_KEEP]:
+        try:
+            os.remove(e.path)
+        except OSError:
+            pass
+
+
+def _load_batch_job(job_id):
+    if not job_id or not all(c in "0123456789abcdef" for c in job_id):
+        return None
+    path = os.path.join(JOB_DIR, job_id + ".npz")
+    if not os.path.exists(path):
+        return None
+
+    with np.load(path) as z:
+        job = {k: z[k] for k in z.files}
+    job["meta"] = json.loads(str(job["meta"]))
+    return job
+
+
+def _grid_counts(P, thresholds):
+    """Rows with P >= t, for every row of P (W, n) and every threshold.
+
+    Each row is sorted once and searched for all thresholds; W (candidate
+    weights) is small. Probabilities are compared exactly as stored, so a
+    row at the threshold counts the same way it was served.
+    """
+    W, n = P.shape
+    S = np.sort(P, axis=1)
+    counts = np.empty((W, len(thresholds)), dtype=np.int64)
+    for i in range(W):
+        counts[i] = n - np.searchsorted(S[i], thresholds, side="left")
+    return counts
+
+
+def _what_if(job, thresholds, weights):
+    rf = job["rf_prob"].astype(float)
+    xgb = job["xgb_prob"].astype(float)
+    current = job["decision"] == 1
+    n = len(rf)
+
+    # (W, n) blend probabilities for every candidate weight at once
+    P = weights[:, None] * rf[None, :] + (1 - weights)[:, None] * xgb[None, :]
+
+    approved = _grid_counts(P, thresholds)
+    newly_approved = _grid_counts(P[:, ~current], thresholds)
+    kept_approved = _grid_counts(P[:, current], thresholds)
+    n_current = int(current.sum())
+
+    outcome = job.get("outcome")
+    has_labels = outcome is not None and bool((outcome >= 0).any())
+    if has_labels:
+        pos = outcome == 1
+        neg = outcome == 0
+        tp = _grid_counts(P[:, pos], thresholds)
+        fp = _grid_counts(P[:, neg], thresholds)
+        n_pos, n_neg = int(pos.sum()), int(neg.sum())
+
+    grid = []
+    for i, w in enumerate(weights):
+        for j, t in enumerate(thresholds):
+            a = int(approved[i, j])
+            entry = {
+                "blend_weight": float(w),
+                "threshold": float(t),
+                "approved": a,
+                "rejected": n - a,
+                "approval_rate": a / n if n else None,
+                "vs_current": {
+                    "approved_both": int(kept_approved[i, j]),
+                    "newly_approved": int(newly_approved[i, j]),
+                    "newly_rejected": n_current - int(kept_approved[i, j]),
+                    "rejected_both": (n - n_current) - int(newly_approved[i, j]),
+                },
+            }
+            if has_labels:
+                tp_ij, fp_ij = int(tp[i, j]), int(fp[i, j])
+                fn_ij, tn_ij = n_pos - tp_ij, n_neg - fp_ij
+                entry["vs_outcome"] = {
+                    "tp": tp_ij, "fp": fp_ij, "tn": tn_ij, "fn": fn_ij,
+                    "precision": tp_ij / (tp_ij + fp_ij) if tp_ij + fp_ij else None,
+                    "recall": tp_ij / n_pos if n_pos else None,
+                    "accuracy": (tp_ij + tn_ij) / (n_pos + n_neg) if n_pos + n_neg else None,
+                }
+            grid.append(entry)
+
+    return {
+        "rows": n,
+        "current": {
+            "threshold": job["meta"]["threshold"],
+            "blend_weight": job["meta"]["blend_weight"],
+            "approved": n_current,
+        },
+        "model_version": job["meta"]["model_version"],
+        "labeled_rows": int((outcome >= 0).sum()) if has_labels else 0,
+        "grid": grid,
+    }
+
+
+REPORT_TZ = ZoneInfo("Asia/Manila")
+
+# Placeholder stamp for cacheable templates. Helvetica digits all have the
+# same width, so swapping in the real date/time keeps the layout and byte
+# length identical.
+PDF_STAMP_DATE = "88 / 88 / 8888"
+PDF_STAMP_TIME = "88:88"
+
+# invariant=1 also fixes the document dates and /ID; both are rewritten
+# per download (same byte length, so the xref offsets stay valid)
+PDF_INVARIANT_DATE = b"(D:20000101000000+00'00')"
+PDF_ID_PATTERN = re.compile(rb"/ID\s*\[<([0-9a-f]{32})><\1>\]")
+
+
+def _build_pdf_bytes(result, input_data, now=None, template=False):
+    buff = BytesIO()
+    now = _build_pdf(result, input_data, buff, now=now, template=template)
+    pdf = buff.getvalue()
+    buff.close()
+    return pdf, now
+
+
+def _build_pdf(result, input_data, out, now=None, template=False):
+    """Render the report straight into the writable file object `out`."""
+    if now is None:
+        now = datetime.now(REPORT_TZ)
     date_str = now.strftime("%d / %m / %Y")
     time_str = now.strftime("%H:%M")
 
+    # template=True renders a deterministic PDF (no random IDs, readable
+    # page streams) with the placeholder stamp, for _stamp_pdf() to fill in
+    doc_options = {}
+    if template:
+        date_str, time_str = PDF_STAMP_DATE, PDF_STAMP_TIME
+        doc_options = {"invariant": 1, "pageCompression": 0}
+
     decision = None
     if result.get("enhanced_model"):
         decision = result["enhanced_model"]["loan_status"]
@@ -521,14 +1597,14 @@ def _build_pdf_bytes(result, input_data):
     styles.add(ParagraphStyle(
         name="MetaX", parent=styles["Normal"], fontSize=10, leading=14, textColor=colors.HexColor("#4B5563")))
 
-    buff = BytesIO()
     doc = SimpleDocTemplate(
-        buff,
+        out,
         pagesize=A4,
         leftMargin=18 * mm,
         rightMargin=18 * mm,
         topMargin=16 * mm,
-        bottomMargin=16 * mm
+        bottomMargin=16 * mm,
+        **doc_options
     )
 
     story = []
@@ -786,9 +1862,363 @@ def _build_pdf_bytes(result, input_data):
     story.append(inputs_tbl)
 
     doc.build(story)
-    pdf = buff.getvalue()
-    buff.close()
-    return pdf, now
+    return now
+
+# ==================== Report Cache ====================
+
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+BUNDLE_COPY_CHUNK = 64 * 1024
+
+REPORT_CACHE_ENABLED = os.environ.get("LOAN_REPORT_CACHE", "1") != "0"
+
+report_cache = None
+if REPORT_CACHE_ENABLED:
+    try:
+        report_cache = ReportCache(
+            os.environ.get("LOAN_REPORT_CACHE_DIR", "cache/reports"),
+            max_bytes=int(os.environ.get("LOAN_REPORT_CACHE_MB", "256")) * 1024 * 1024
+        )
+    except Exception as e:
+        print(f"⚠️ Report cache disabled: {e}")
+
+
+def _report_cache_key(df, input_data):
+    # Same scored vector + same displayed inputs + same models => same PDF
+    shown = [_display_input_value(k, input_data.get(k, ""))
+             for k in INPUT_ORDER]
+    payload = json.dumps(
+        [MODEL_VERSION, df.iloc[0].tolist(), shown], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _stamp_offsets(template_pdf):
+    """Byte offsets of every placeholder in a template, or None when the
+    visible date/time stamp is not found exactly once."""
+    def find_all(pattern):
+        # works on bytes and on memoryviews of the render buffer
+        return [m.start() for m in re.finditer(re.escape(pattern), template_pdf)]
+
+    date_at = find_all(PDF_STAMP_DATE.encode("latin-1"))
+    time_at = find_all(PDF_STAMP_TIME.encode("latin-1"))
+    if len(date_at) != 1 or len(time_at) != 1:
+        return None
+
+    # /ID [<hex><hex>]: both hex strings, 32 chars + "><" apart
+    ids = []
+    for m in PDF_ID_PATTERN.finditer(template_pdf):
+        ids += [m.start(1), m.start(1) + 34]
+
+    return {
+        "date": date_at,
+        "time": time_at,
+        "doc_date": find_all(PDF_INVARIANT_DATE),
+        "doc_id": ids,
+    }
+
+
+def _stamp_patches(offsets, now):
+    """(offset, bytes) patches that stamp `now` into a template. The
+    document dates get the real serve time and /ID a fresh random value;
+    every patch keeps the byte length, so the xref offsets stay valid."""
+    values = {
+        "date": now.strftime("%d / %m / %Y").encode("latin-1"),
+        "time": now.strftime("%H:%M").encode("latin-1"),
+        "doc_date": _pdf_date(now),
+        "doc_id": uuid.uuid4().hex.encode("ascii"),
+    }
+    return [(off, values[name]) for name, offs in offsets.items() for off in offs]
+
+
+def _stamp_pdf(template_pdf, now):
+    """Stamped copy of a template as bytes; None if the stamp is not found."""
+    offsets = _stamp_offsets(template_pdf)
+    if offsets is None:
+        return None
+
+    pdf = bytearray(template_pdf)
+    for off, data in _stamp_patches(offsets, now):
+        pdf[off:off + len(data)] = data
+    return bytes(pdf)
+
+
+def _pdf_date(now):
+    """PDF date string, e.g. (D:20260519143000+08'00'), same length as the
+    invariant placeholder."""
+    offset = int(now.utcoffset().total_seconds() // 60) if now.utcoffset() else 0
+    sign = "+" if offset >= 0 else "-"
+    offset = abs(offset)
+    return (f"(D:{now.strftime('%Y%m%d%H%M%S')}"
+            f"{sign}{offset // 60:02d}'{offset % 60:02d}')").encode("latin-1")
+
+
+def _spooled_pdf(result, data, now):
+    # Small reports stay in memory, anything larger spills to a temp file
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    _build_pdf(result, data, out, now=now)
+    out.seek(0)
+    return out
+
+
+def _render_report(data, source):
+    """Readable file object with the PDF for one row, plus its timestamp.
+
+    A cache hit streams the cached template file with the stamp patched in
+    while it is read. A miss renders the template once, stores it and
+    serves that same buffer patched; without the cache the PDF is rendered
+    straight into a spooled temp file.
+    """
+    now = datetime.now(REPORT_TZ)
+
+    if report_cache is None:
+        result, _ = _run_inference_and_explain(data, source=source)
+        return _spooled_pdf(result, data, now), now
+
+    df, ok, errors = _validate_rows([data])
+    if not ok[0]:
+        raise ValueError(errors[0])
+
+    key = _report_cache_key(df, data)
+    cached = report_cache.open(key)
+    if cached is not None:
+        template_file, meta = cached
+        if "stamp" in meta:
+            scores = {k: np.asarray([v]) for k, v in meta["scores"].items()}
+            _observe_scored(source, df, scores)
+            return PatchedReader(template_file, _stamp_patches(meta["stamp"], now)), now
+        # entry written before stamp offsets were stored: re-render
+        template_file.close()
+
+    result, df, scores = _infer_row(data)
+    _observe_scored(source, df, scores)
+
+    template_buff = BytesIO()
+    _build_pdf(result, data, template_buff, template=True)
+    template = template_buff.getbuffer()
+
+    offsets = _stamp_offsets(template)
+    if offsets is not None:
+        meta = {
+            "scores": {k: v[0].item() for k, v in scores.items()},
+            "stamp": offsets,
+        }
+        report_cache.put(key, template, meta)
+    # the buffer cannot be closed while a view is exported
+    template.release()
+
+    if offsets is None:
+        return _spooled_pdf(result, data, now), now
+
+    template_buff.seek(0)
+    return PatchedReader(template_buff, _stamp_patches(offsets, now)), now
+
+
+def _render_report_bundle(rows, source):
+    """ZIP of one PDF per row, built in a spooled temp file."""
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    failures = []
+
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for i, data in enumerate(rows):
+            try:
+                pdf_file, _ = _render_report(data, source=source)
+            except Exception as e:
+                failures.append({"row": i, "error": str(e)})
+                continue
+
+            with pdf_file, zf.open(f"Loan_Risk_Report_{i + 1:05d}.pdf", "w") as dst:
+                shutil.copyfileobj(pdf_file, dst, BUNDLE_COPY_CHUNK)
+
+        if failures:
+            zf.writestr("errors.json", json.dumps(failures, indent=2))
+
+    out.seek(0)
+    return out
+
+
+# ==================== Batch Sessions ====================
+
+result_store = None
+try:
+    result_store = ResultStore(
+        os.environ.get("LOAN_BATCH_DIR", os.path.join("cache", "batches")),
+        feature_names,
+        keep=int(os.environ.get("LOAN_BATCH_KEEP", "50"))
+    )
+except Exception as e:
+    print(f"⚠️ Batch result store disabled: {e}")
+
+
+def _risk_columns(prob, ok):
+    # Same rounding as _model_results(); invalid rows stay NaN (NULL)
+    prob = _scatter(np.asarray(prob, dtype=float), ok, np.nan, float)
+    risk = np.round(100 - prob * 100, 2)
+    confidence = np.round(np.maximum(prob, 1 - prob) * 100, 2)
+    return risk, confidence
+
+
+def _create_batch_session(raw, filename=None):
+    """Validate, score and store an uploaded frame; returns the batch meta."""
+    df, ok, errors = _validate_rows(raw)
+
+    scores = {}
+    if ok.any():
+        if request.args.get("mode") == "incremental" and score_store is not None:
+            scores, df_hybrid, rescored = _score_frame_incremental(df[ok])
+            if rescored.any():
+                _sample_shap(df[ok][rescored], df_hybrid)
+        else:
+            scores, df_hybrid = _score_frame(df[ok])
+            _sample_shap(df[ok], df_hybrid)
+        _observe_scored("batches", df[ok], scores)
+
+    n = len(ok)
+    columns = {
+        "ok": ok.astype(np.int8),
+        "error": np.asarray(errors, dtype=object),
+    }
+    for prefix, prob_key, dec_key in (("", "final_prob", "decision"),
+                                      ("baseline_", "baseline_prob", "baseline_decision")):
+        if prob_key in scores:
+            risk, confidence = _risk_columns(scores[prob_key], ok)
+            decision = _scatter(scores[dec_key].astype(float), ok, np.nan, float)
+        else:
+            risk = confidence = decision = np.full(n, np.nan)
+        columns[prefix + "risk_percentage"] = risk
+        columns[prefix + "decision"] = decision
+        if not prefix:
+            columns["confidence_score"] = confidence
+    for name in feature_names:
+        columns[name] = df[name].to_numpy()
+
+    # Original values (labels as uploaded) for display; NaN -> null
+    values = raw.astype(object).where(raw.notna(), None).to_dict("records")
+
+    decisions = scores.get("decision", scores.get("baseline_decision"))
+    batch_id = uuid.uuid4().hex
+    meta = {
+        "batch_id": batch_id,
+        "filename": filename,
+        "created": datetime.now(REPORT_TZ).isoformat(timespec="seconds"),
+        "model_version": MODEL_VERSION,
+        "columns": [str(c) for c in raw.columns],
+        "rows": int(n),
+        "valid": int(ok.sum()),
+        "approved": int(decisions.sum()) if decisions is not None else 0,
+        "sortable": list(result_store.sortable),
+        "filterable": list(result_store.filterable),
+    }
+    result_store.create(batch_id, columns, values, meta)
+    return meta
+
+
+def _page_filters(args):
+    """Filters for ResultStore.page() from query args (names checked there)."""
+    filters = {}
+    decision = (args.get("decision") or "").strip().lower()
+    if decision in ("approved", "1"):
+        filters["decision"] = 1
+    elif decision in ("rejected", "0"):
+        filters["decision"] = 0
+    elif decision:
+        raise ValueError(f"Unknown decision: {decision}")
+
+    if args.get("ok") in ("0", "1"):
+        filters["ok"] = int(args["ok"])
+
+    for key, value in args.items():
+        if (key.endswith("_min") or key.endswith("_max")) and value != "":
+            filters[key] = value
+    return filters
+
+
+# ==================== SHAP Summary Report ====================
+
+
+def _build_shap_summary_pdf(summary, out, now=None):
+    """One-page portfolio "top drivers" report from shap_summary.snapshot()."""
+    if now is None:
+        now = datetime.now(REPORT_TZ)
+
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        name="H1X", parent=styles["Heading1"], fontSize=18, leading=22, spaceAfter=6))
+    styles.add(ParagraphStyle(
+        name="H2X", parent=styles["Heading2"], fontSize=12, leading=15, spaceAfter=4))
+    styles.add(ParagraphStyle(
+        name="MetaX", parent=styles["Normal"], fontSize=9, leading=12, textColor=colors.HexColor("#4B5563")))
+
+    doc = SimpleDocTemplate(
+        out,
+        pagesize=A4,
+        leftMargin=18 * mm,
+        rightMargin=18 * mm,
+        topMargin=16 * mm,
+        bottomMargin=16 * mm,
+    )
+
+    story = [
+        Paragraph("Portfolio Explainability Summary", styles["H1X"]),
+        Paragraph(
+            f"Generated {now.strftime('%d / %m / %Y %H:%M')} &nbsp;|&nbsp; "
+            f"Model version {MODEL_VERSION}", styles["MetaX"]),
+        Spacer(1, 8),
+    ]
+
+    titles = {
+        "baseline": "Baseline (Random Forest)",
+        "enhanced": "Optimized (RF + XGBoost)",
+    }
+    col_widths = [doc.width * w for w in (0.28, 0.13, 0.13, 0.12, 0.12, 0.22)]
+
+    explainers = summary.get("explainers", {})
+    if not explainers:
+        story.append(Paragraph("No explained rows yet.", styles["Normal"]))
+
+    for name in ("baseline", "enhanced"):
+        block = explainers.get(name)
+        if not block:
+            continue
+
+        story.append(Paragraph(
+            f"{titles[name]} &mdash; {block['rows']:,} rows", styles["H2X"]))
+
+        data = [["Feature", "Mean |SHAP|", "Mean SHAP", "Share", "Top driver", "Impact p50 / p90"]]
+        for f in block["features"][:SHAP_SUMMARY_TOP]:
+            data.append([
+                LABEL_MAP.get(f["feature"], f["feature"]),
+                f"{f['mean_abs_contribution']:.4f}",
+                f"{f['mean_contribution']:+.4f}",
+                f"{f['share_percent']:.1f}%",
+                f"{f['top_driver_rate'] * 100:.1f}%",
+                f"{f['impact_p50']:.1f}% / {f['impact_p90']:.1f}%",
+            ])
+
+        tbl = Table(data, colWidths=col_widths, hAlign="LEFT")
+        tbl.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#111827")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#E5E7EB")),
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1),
+             [colors.white, colors.HexColor("#F9FAFB")]),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+            ("TOPPADDING", (0, 0), (-1, -1), 4),
+        ]))
+        story.append(tbl)
+        story.append(Spacer(1, 10))
+
+    story.append(Paragraph(
+        "Share: the feature's part of the total mean |SHAP|. Top driver: share of "
+        "rows where the feature had the largest |SHAP|. Impact p50 / p90: "
+        "median and 90th percentile of the per-row impact percent.",
+        styles["MetaX"]))
+
+    doc.build(story)
+    return now
+
 
 # ==================== Routes ====================
 
@@ -842,56 +2272,24 @@ def predict():
         if not data:
             return json_response({"error": "No data provided"}, 400)
 
-        df = pd.DataFrame([data])
-
-        missing = [f for f in feature_names if f not in df.columns]
+        missing = [f for f in feature_names if f not in data]
         if missing:
             return json_response({
                 "error": "Missing required fields",
                 "missing": missing
             }, 400)
 
-        df = df[feature_names]
-
-        result = {}
-        df_hybrid = None
-
-        # ================= Enhanced Model =================
-        if artifact and rf_feature_model:
-            rf_oof_proba = rf_feature_model.predict_proba(df)[:, 1]
-
-            df_hybrid = df.copy()
-            df_hybrid[hybrid_feature_name] = rf_oof_proba
-
-            rf_prob = float(rf_best.predict_proba(df_hybrid)[0][1])
-            xgb_prob = float(xgb_best.predict_proba(df_hybrid)[0][1])
-
-            final_prob = (blend_weight * rf_prob) + \
-                         ((1 - blend_weight) * xgb_prob)
-
-            prediction = int(final_prob >= threshold)
-
-            result["enhanced_model"] = {
-                "loan_status": "Approved" if prediction else "Rejected",
-                "risk_percentage": round((100 - (final_prob * 100)), 2),
-                "rf_probability": round(rf_prob * 100, 2),
-                "xgb_probability": round(xgb_prob * 100, 2),
-                "confidence_score": round(max(final_prob, 1 - final_prob) * 100, 2),
-                "model_type": "enhanced_blend"
-            }
+        df, ok, errors = _validate_rows([data])
+        if not ok[0]:
+            return json_response({
+                "error": "Invalid input",
+                "message": errors[0]
+            }, 400)
 
-        # ================= Baseline Model =================
-        if baseline_model:
-            baseline_prob = float(baseline_model.predict_proba(df)[0][1])
-            baseline_pred = int(baseline_model.predict(df)[0])
-
-            result["baseline_model"] = {
-                "loan_status": "Approved" if baseline_pred else "Rejected",
-                "risk_percentage": round((100 - (baseline_prob * 100)), 2),
-                "rf_probability": round(baseline_prob * 100, 2),
-                "confidence_score": round(max(baseline_prob, 1 - baseline_prob) * 100, 2),
-                "model_type": "baseline_rf"
-            }
+        # ================= Enhanced + Baseline Models =================
+        scores, df_hybrid = _score_frame(df)
+        result = _model_results(scores)
+        _observe_scored("predict", df, scores)
 
         # ✅ PASTE STEP 3 HERE (console explainability block)
         # ==================== Console Explainability Output (ADD) ====================
@@ -901,6 +2299,7 @@ def predict():
                 # Baseline SHAP -> result JSON
                 if baseline_model and baseline_explainer is not None:
                     b_vals, _ = _get_pos_class_shap(baseline_explainer, df)
+                    _observe_shap({"baseline_shap": b_vals})
                     result["baseline_explainability"] = {
                         "method": "shap",
                         "items": _shap_to_json(feature_names, b_vals)
@@ -925,6 +2324,7 @@ def predict():
                     # 2) blend the 16-feature contributions (final decision)
                     blend_16 = (blend_weight * np.asarray(rf_16)) + \
                         ((1 - blend_weight) * np.asarray(xgb_16))
+                    _observe_shap({"enhanced_shap": blend_16})
 
                     # 3) baseline-style JSON output (16 features only)
                     items_16 = _shap_to_json(feature_names, blend_16)
@@ -939,7 +2339,7 @@ def predict():
         except Exception as ee:
             print(f"⚠️ SHAP JSON output failed: {ee}")
 
-        return json_response(convert_numpy_types(result))
+        return json_response(result)
 
     except Exception as e:
         return json_response({
@@ -956,35 +2356,26 @@ def predict_batch():
         if not rows or not isinstance(rows, list):
             return json_response({"error": "No rows provided"}, 400)
 
-        out = []
-        for r in rows:
-            try:
-                res, _ = _run_inference_and_explain(r)
-
-                decision = None
-                if res.get("enhanced_model"):
-                    decision = res["enhanced_model"]["loan_status"]
-                elif res.get("baseline_model"):
-                    decision = res["baseline_model"]["loan_status"]
-                else:
-                    decision = "None"
-
-                out.append({
-                    "ok": True,
-                    "loan_status": decision
-                })
-            except Exception as ee:
-                out.append({
-                    "ok": False,
-                    "error": str(ee)
-                })
-
-        return json_response({"results": out}, 200)
+        return _batch_response(rows)
 
     except Exception as e:
         return json_response({"error": "Batch prediction failed", "message": str(e)}, 500)
 
 
+@app.route("/predict-csv", methods=["POST"])
+def predict_csv():
+    # Raw-label CSVs ("management", "may", ...) are encoded server-side
+    try:
+        df = _read_uploaded_csv()
+        if df.empty:
+            return json_response({"error": "CSV is empty"}, 400)
+
+        return _batch_response(df, source="predict-csv")
+
+    except Exception as e:
+        return json_response({"error": "CSV prediction failed", "message": str(e)}, 500)
+
+
 @app.route("/report", methods=["POST"])
 def report():
     try:
@@ -992,13 +2383,12 @@ def report():
         if not data:
             return json_response({"error": "No data provided"}, 400)
 
-        result, _ = _run_inference_and_explain(data)
-        pdf_bytes, now = _build_pdf_bytes(result, data)
+        pdf_file, now = _render_report(data, source="report")
 
         filename = "Loan_Risk_Report_" + now.strftime("%Y%m%d_%H%M") + ".pdf"
 
         return send_file(
-            BytesIO(pdf_bytes),
+            pdf_file,
             mimetype="application/pdf",
             as_attachment=True,
             download_name=filename
@@ -1018,13 +2408,12 @@ def report_row():
         if not data:
             return json_response({"error": "No data provided"}, 400)
 
-        result, _ = _run_inference_and_explain(data)
-        pdf_bytes, now = _build_pdf_bytes(result, data)
+        pdf_file, now = _render_report(data, source="report-row")
 
         filename = "Loan_Risk_Report_" + now.strftime("%Y%m%d_%H%M%S") + ".pdf"
 
         return send_file(
-            BytesIO(pdf_bytes),
+            pdf_file,
             mimetype="application/pdf",
             as_attachment=True,   # ✅ open in browser tab
             download_name=filename
@@ -1036,6 +2425,192 @@ def report_row():
             "message": str(e)
         }, 500)
 
+@app.route("/report-bundle", methods=["POST"])
+def report_bundle():
+    try:
+        payload = request.get_json()
+        rows = payload.get("rows") if isinstance(payload, dict) else None
+        if not rows or not isinstance(rows, list):
+            return json_response({"error": "No rows provided"}, 400)
+
+        bundle = _render_report_bundle(rows, source="report-bundle")
+        now = datetime.now(REPORT_TZ)
+
+        return send_file(
+            bundle,
+            mimetype="application/zip",
+            as_attachment=True,
+            download_name="Loan_Risk_Reports_" + now.strftime("%Y%m%d_%H%M%S") + ".zip"
+        )
+
+    except Exception as e:
+        return json_response({
+            "error": "Report bundle generation failed",
+            "message": str(e)
+        }, 500)
+
+@app.route("/what-if", methods=["POST"])
+def what_if():
+    try:
+        payload = request.get_json() or {}
+        job = _load_batch_job(str(payload.get("job_id", "")))
+        if job is None:
+            return json_response({"error": "Unknown or expired job_id"}, 404)
+
+        meta = job["meta"]
+        try:
+            thresholds = np.asarray(
+                payload.get("thresholds") or np.round(np.linspace(0.05, 0.95, 19), 2).tolist() + [meta["threshold"]],
+                dtype=float)
+            weights = np.asarray(
+                payload.get("blend_weights") or [meta["blend_weight"]], dtype=float)
+        except (TypeError, ValueError):
+            return json_response({"error": "thresholds and blend_weights must be lists of numbers"}, 400)
+
+        if thresholds.ndim != 1 or weights.ndim != 1:
+            return json_response({"error": "thresholds and blend_weights must be lists"}, 400)
+        if not (np.isfinite(thresholds).all() and np.isfinite(weights).all()):
+            return json_response({"error": "thresholds and blend_weights must be finite"}, 400)
+        if ((thresholds < 0) | (thresholds > 1)).any() or ((weights < 0) | (weights > 1)).any():
+            return json_response({"error": "thresholds and blend_weights must be within [0, 1]"}, 400)
+        if len(thresholds) * len(weights) > WHAT_IF_MAX_GRID:
+            return json_response({"error": f"Grid larger than {WHAT_IF_MAX_GRID} points"}, 400)
+
+        thresholds = np.unique(thresholds)
+        weights = np.unique(weights)
+        return json_response(_what_if(job, thresholds, weights))
+
+    except Exception as e:
+        return json_response({"error": "What-if analysis failed", "message": str(e)}, 500)
+
+@app.route("/batches", methods=["POST"])
+def create_batch():
+    # Upload once, then page through the scored rows with GET .../rows
+    if result_store is None:
+        return json_response({"error": "Batch result store disabled"}, 503)
+    try:
+        raw = _read_uploaded_csv()
+        if raw.empty:
+            return json_response({"error": "CSV is empty"}, 400)
+
+        upload = request.files.get("file")
+        meta = _create_batch_session(raw, upload.filename if upload else None)
+        return json_response(meta, 201)
+
+    except Exception as e:
+        return json_response({"error": "Batch upload failed", "message": str(e)}, 500)
+
+
+@app.route("/batches/<batch_id>", methods=["GET", "DELETE"])
+def batch_meta(batch_id):
+    if result_store is None:
+        return json_response({"error": "Batch result store disabled"}, 503)
+    try:
+        if request.method == "DELETE":
+            result_store.delete(batch_id)
+            return json_response({"deleted": batch_id})
+        return json_response(result_store.meta(batch_id))
+
+    except KeyError:
+        return json_response({"error": "Unknown batch_id"}, 404)
+    except Exception as e:
+        return json_response({"error": "Batch lookup failed", "message": str(e)}, 500)
+
+
+@app.route("/batches/<batch_id>/rows")
+def batch_rows(batch_id):
+    if result_store is None:
+        return json_response({"error": "Batch result store disabled"}, 503)
+    try:
+        args = request.args
+        page = result_store.page(
+            batch_id,
+            page=args.get("page", 1, type=int),
+            page_size=args.get("page_size", 50, type=int),
+            sort=args.get("sort", "row"),
+            order=args.get("order", "asc"),
+            filters=_page_filters(args),
+        )
+        return json_response(page)
+
+    except KeyError:
+        return json_response({"error": "Unknown batch_id"}, 404)
+    except ValueError as e:
+        return json_response({"error": "Invalid query", "message": str(e)}, 400)
+    except Exception as e:
+        return json_response({"error": "Batch page failed", "message": str(e)}, 500)
+
+
+# ==================== Monitoring ====================
+
+
+@app.route("/monitoring/drift")
+def monitoring_drift():
+    # Merged over every worker of this server run, not just the one answering
+    try:
+        monitor, pids = drift_monitor, [os.getpid()]
+        if drift_publisher is not None:
+            states, pids = drift_publisher.collect()
+            monitor = drift_monitor.empty_copy()
+            for state in states:
+                monitor.merge_state(state)
+
+        snap = monitor.snapshot()
+        snap["model_version"] = MODEL_VERSION
+        snap["baseline_loaded"] = bool(drift_monitor.baseline)
+        snap["pid"] = os.getpid()
+        snap["processes"] = pids
+        return json_response(snap)
+    except Exception as e:
+        return json_response({"error": "Drift snapshot failed", "message": str(e)}, 500)
+
+@app.route("/monitoring/runtime")
+def monitoring_runtime():
+    return json_response(runtime.snapshot())
+
+def _merged_shap_summary(top=None):
+    """Snapshot merged over every worker of this server run."""
+    summary, pids = shap_summary, [os.getpid()]
+    if shap_publisher is not None:
+        states, pids = shap_publisher.collect()
+        summary = shap_summary.empty_copy()
+        for state in states:
+            summary.merge_state(state)
+
+    snap = summary.snapshot(top=top)
+    snap["pid"] = os.getpid()
+    snap["processes"] = pids
+    return snap
+
+
+@app.route("/monitoring/shap")
+def monitoring_shap():
+    if shap_summary is None:
+        return json_response({"error": "SHAP summary disabled"}, 404)
+    try:
+        top = request.args.get("top", type=int)
+        return json_response(_merged_shap_summary(top=top))
+    except Exception as e:
+        return json_response({"error": "SHAP summary failed", "message": str(e)}, 500)
+
+
+@app.route("/monitoring/shap/report")
+def monitoring_shap_report():
+    if shap_summary is None:
+        return json_response({"error": "SHAP summary disabled"}, 404)
+    try:
+        out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        now = _build_shap_summary_pdf(_merged_shap_summary(), out)
+        out.seek(0)
+        return send_file(
+            out,
+            mimetype="application/pdf",
+            as_attachment=True,
+            download_name=f"shap_summary_{now.strftime('%Y%m%d_%H%M')}.pdf"
+        )
+    except Exception as e:
+        return json_response({"error": "SHAP summary report failed", "message": str(e)}, 500)
+
 # ==================== Health Check ====================
 
 
@@ -1044,12 +2619,20 @@ def health():
     status = {
         "enhanced_model_loaded": artifact is not None,
         "baseline_model_loaded": baseline_model is not None,
-        "feature_count": len(feature_names)
+        "feature_count": len(feature_names),
+        "model_version": MODEL_VERSION,
+        "distilled_model_loaded": distilled_model is not None,
+        "cascade": dict(cascade_stats),
+        "audit": dict(audit_sink.stats) if audit_sink is not None else None,
+        "report_cache": dict(report_cache.stats) if report_cache is not None else None,
+        "score_store": dict(score_store.stats) if score_store is not None else None
     }
-    return json_response(convert_numpy_types(status))
+    return json_response(status)
 
 # ==================== Run Server ====================
 
 
+# Development server only; use `python serve.py` in production.
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=5000)
+    app.run(debug=os.environ.get("FLASK_DEBUG") == "1",
+            host="0.0.0.0", port=5000)
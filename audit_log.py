@@ -0,0 +1,336 @@
+# audit_log.py file
+#
+# Append-only audit trail of every scored row. Request threads only append
+# column chunks to an in-memory buffer (O(1), no I/O); a background thread
+# flushes them in bulk to rotating local files:
+#
+#   sqlite  : <dir>/audit-YYYYMMDD-<pid>-NNN.sqlite, rotated daily and by size
+#   parquet : <dir>/YYYYMMDD/part-<pid>-<ms>-<seq>.parquet, one file per flush
+#
+# Each worker process writes its own files, so there is no cross-process
+# locking on the hot path.
+#
+# Rows are never dropped. A failed write puts its chunks back at the front
+# of the buffer and the flush thread retries with exponential backoff. The
+# buffer is bounded: once max_pending_rows are waiting (disk slow or
+# failing), record() blocks the request thread until the flush catches up,
+# and raises AuditBacklogFull after block_timeout seconds, so the request
+# fails instead of serving a decision that is not logged. Anything still
+# unwritten at exit is spilled to an .npz file.
+
+import os
+import time
+import tempfile
+import atexit
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+SCORE_COLUMNS = ("rf_prob", "xgb_prob", "final_prob", "baseline_prob")
+DECISION_COLUMNS = ("decision", "baseline_decision")
+
+
+class AuditBacklogFull(RuntimeError):
+    """The audit buffer stayed full for block_timeout seconds."""
+
+
+class AuditSink:
+    def __init__(self, directory, feature_names, fmt="sqlite",
+                 flush_interval=1.0, batch_size=5000,
+                 max_file_bytes=256 * 1024 * 1024,
+                 max_pending_rows=200000, block_timeout=30.0,
+                 max_backoff=60.0):
+        if fmt == "parquet" and pa is None:
+            print("⚠️ pyarrow not installed, audit log falls back to SQLite")
+            fmt = "sqlite"
+
+        self.directory = directory
+        self.feature_names = list(feature_names)
+        self.fmt = fmt
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_file_bytes = max_file_bytes
+        self.max_pending_rows = max_pending_rows
+        self.block_timeout = block_timeout
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._space = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._chunks = []
+        self._pending = 0
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self._failures = 0
+        self._retry_at = 0.0
+
+        # writer state, guarded by _write_lock
+        self._conn = None
+        self._path = None
+        self._day = None
+        self._seq = 0
+
+        self.stats = {
+            "recorded": 0, "written": 0, "pending": 0, "flushes": 0,
+            "errors": 0, "retries_pending": 0, "blocked": 0, "rejected": 0,
+            "spilled": 0,
+        }
+
+        atexit.register(self.close)
+
+    # ---------- request thread side ----------
+
+    def record(self, source, X, scores, threshold, model_version):
+        """Queue one chunk of scored rows. X is (n, features)."""
+        X = np.asarray(X, dtype=float)
+        n = len(X)
+        if n == 0:
+            return
+
+        chunk = {
+            "ts": np.full(n, time.time()),
+            "source": source,
+            "model_version": model_version,
+            "threshold": np.nan if threshold is None else float(threshold),
+            "X": X.copy(),
+        }
+        for name in SCORE_COLUMNS + DECISION_COLUMNS:
+            if name in scores:
+                chunk[name] = np.asarray(scores[name])
+
+        self._ensure_thread()
+        with self._lock:
+            # Backpressure: wait for the flush thread rather than grow
+            # without bound (an oversized chunk is admitted on its own)
+            if self._pending and self._pending + n > self.max_pending_rows:
+                self.stats["blocked"] += 1
+                self._wake.set()
+                if not self._space.wait_for(
+                        lambda: self._closed or not self._pending
+                        or self._pending + n <= self.max_pending_rows,
+                        timeout=self.block_timeout):
+                    self.stats["rejected"] += n
+                    raise AuditBacklogFull(
+                        f"audit log backlog full ({self._pending} rows unwritten)")
+
+            self._chunks.append(chunk)
+            self._pending += n
+            self.stats["recorded"] += n
+            self.stats["pending"] = self._pending
+            pending = self._pending
+
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def _ensure_thread(self):
+        # Threads do not survive fork: (re)start lazily in each worker
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._conn = None
+            self._thread = threading.Thread(
+                target=self._run, name="audit-flush", daemon=True)
+            self._thread.start()
+
+    # ---------- flush thread side ----------
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if time.monotonic() < self._retry_at:
+                continue
+            self.flush()
+
+    def flush(self):
+        """Write all buffered rows; on failure they stay buffered. Returns
+        True when the buffer was written (or empty)."""
+        with self._write_lock:
+            with self._lock:
+                chunks, self._chunks = self._chunks, []
+            if not chunks:
+                return True
+
+            n = sum(len(c["ts"]) for c in chunks)
+            try:
+                columns = self._to_columns(chunks)
+                if self.fmt == "parquet":
+                    self._write_parquet(columns)
+                else:
+                    self._write_sqlite(columns)
+            except Exception as e:
+                # Keep the rows, in order, ahead of anything recorded since
+                with self._lock:
+                    self._chunks[:0] = chunks
+                    self.stats["retries_pending"] = n
+                self.stats["errors"] += 1
+                self._failures += 1
+                delay = min(self.max_backoff,
+                            self.flush_interval * 2 ** self._failures)
+                self._retry_at = time.monotonic() + delay
+                self._reset_writer()
+                print(f"⚠️ Audit flush failed ({n} rows kept, retry in {delay:.0f}s): {e}")
+                return False
+
+            self._failures = 0
+            self._retry_at = 0.0
+            with self._lock:
+                self._pending -= n
+                self.stats["pending"] = self._pending
+                self.stats["retries_pending"] = 0
+                self._space.notify_all()
+            self.stats["written"] += n
+            self.stats["flushes"] += 1
+            return True
+
+    def _reset_writer(self):
+        # A failed SQLite write may leave the connection unusable
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        written = self.flush()
+        with self._write_lock:
+            self._reset_writer()
+            if not written:
+                self._spill()
+        with self._lock:
+            self._space.notify_all()
+
+    def _spill(self):
+        """Last resort at exit: dump unwritten rows to an .npz file."""
+        with self._lock:
+            chunks, self._chunks = self._chunks, []
+        if not chunks:
+            return
+
+        columns = self._to_columns(chunks)
+        name = f"audit-unwritten-{os.getpid()}-{int(time.time() * 1000)}.npz"
+        for directory in (self.directory, tempfile.gettempdir()):
+            try:
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, name)
+                np.savez(path, **{k: np.asarray(v) for k, v in columns.items()})
+                self.stats["spilled"] += len(columns["ts"])
+                print(f"⚠️ Audit: {len(columns['ts'])} unwritten rows spilled to {path}")
+                return
+            except Exception as e:
+                print(f"⚠️ Audit spill to {directory} failed: {e}")
+
+    def _to_columns(self, chunks):
+        columns = {
+            "ts": np.concatenate([c["ts"] for c in chunks]),
+            "source": np.concatenate(
+                [np.full(len(c["ts"]), c["source"], dtype=object) for c in chunks]),
+            "model_version": np.concatenate(
+                [np.full(len(c["ts"]), c["model_version"], dtype=object) for c in chunks]),
+            "threshold": np.concatenate(
+                [np.full(len(c["ts"]), c["threshold"]) for c in chunks]),
+        }
+
+        X = np.concatenate([c["X"] for c in chunks])
+        for j, name in enumerate(self.feature_names):
+            columns[name] = X[:, j]
+
+        for name in SCORE_COLUMNS:
+            columns[name] = np.concatenate([
+                c[name].astype(float) if name in c else np.full(len(c["ts"]), np.nan)
+                for c in chunks])
+        for name in DECISION_COLUMNS:
+            columns[name] = np.concatenate([
+                c[name].astype(np.int8) if name in c else np.full(len(c["ts"]), -1, np.int8)
+                for c in chunks])
+
+        return columns
+
+    def _write_parquet(self, columns):
+        now = datetime.now(timezone.utc)
+        day_dir = os.path.join(self.directory, now.strftime("%Y%m%d"))
+        os.makedirs(day_dir, exist_ok=True)
+
+        self._seq += 1
+        name = f"part-{os.getpid()}-{int(now.timestamp() * 1000)}-{self._seq:06d}.parquet"
+        table = pa.table({k: v for k, v in columns.items()})
+        pq.write_table(table, os.path.join(day_dir, name))
+
+    def _sqlite_connection(self):
+        day = datetime.now(timezone.utc).strftime("%Y%m%d")
+        too_big = (
+            self._path is not None
+            and os.path.exists(self._path)
+            and os.path.getsize(self._path) >= self.max_file_bytes
+        )
+        if self._conn is not None and day == self._day and not too_big:
+            return self._conn
+
+        if self._conn is not None:
+            self._conn.close()
+        if day != self._day:
+            self._seq = 0
+        self._day = day
+
+        os.makedirs(self.directory, exist_ok=True)
+        while True:
+            self._seq += 1
+            path = os.path.join(
+                self.directory, f"audit-{day}-{os.getpid()}-{self._seq:03d}.sqlite")
+            if not os.path.exists(path) or os.path.getsize(path) < self.max_file_bytes:
+                break
+
+        feature_cols = ", ".join(f'"{f}" REAL' for f in self.feature_names)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "ts REAL, source TEXT, model_version TEXT, threshold REAL, "
+            f"{feature_cols}, "
+            "rf_prob REAL, xgb_prob REAL, final_prob REAL, baseline_prob REAL, "
+            "decision INTEGER, baseline_decision INTEGER)"
+        )
+        self._conn = conn
+        self._path = path
+        return conn
+
+    def _write_sqlite(self, columns):
+        conn = self._sqlite_connection()
+        names = list(columns)
+        placeholders = ", ".join("?" for _ in names)
+        quoted = ", ".join(f'"{n}"' for n in names)
+
+        # NaN -> NULL so missing models read back as missing
+        values = []
+        for n in names:
+            col = columns[n]
+            if col.dtype.kind == "f":
+                col = np.where(np.isnan(col), None, col)
+            values.append(col.tolist())
+
+        with conn:
+            conn.executemany(
+                f"INSERT INTO predictions ({quoted}) VALUES ({placeholders})",
+                zip(*values)
+            )
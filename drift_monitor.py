@@ -0,0 +1,292 @@
+# drift_monitor.py file
+#
+# Incremental input / score distribution monitoring. Raw rows are never
+# stored: every scored batch only updates fixed-size state (per-feature
+# histograms, running moments, category counts and a probability
+# histogram), so the cost per row is O(1) and memory is O(features * bins).
+#
+# PSI is computed against a stored baseline (see
+# scripts/build_drift_baseline.py), which also supplies the bin edges.
+#
+# state() / merge_state() export and fold the raw running state, so the
+# monitors of several worker processes can be combined (shared_state.py).
+
+import json
+import threading
+
+import numpy as np
+
+
+# 1-2-5 series on both sides of zero, used when no baseline edges exist
+_STEPS = [m * 10 ** e for e in range(0, 7) for m in (1, 2, 5)]
+DEFAULT_EDGES = np.asarray(sorted({0.0} | {float(s) for s in _STEPS} | {-float(s) for s in _STEPS}))
+
+PSI_EPS = 1e-4
+
+
+def psi(actual, expected):
+    """Population stability index between two count/proportion vectors."""
+    a = np.asarray(actual, dtype=float)
+    e = np.asarray(expected, dtype=float)
+    if a.sum() <= 0 or e.sum() <= 0:
+        return None
+    a = np.clip(a / a.sum(), PSI_EPS, None)
+    e = np.clip(e / e.sum(), PSI_EPS, None)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def _hist_quantiles(edges, counts, lo, hi, qs):
+    # Linear interpolation inside histogram bins; the open-ended outer bins
+    # are bounded by the observed min / max.
+    total = counts.sum()
+    if total == 0:
+        return [None] * len(qs)
+
+    bounds = np.concatenate([[lo], np.clip(edges, lo, hi), [hi]])
+    cum = np.cumsum(counts)
+    out = []
+    for q in qs:
+        target = q * total
+        i = int(np.searchsorted(cum, target, side="left"))
+        i = min(i, len(counts) - 1)
+        prev = cum[i - 1] if i > 0 else 0
+        frac = (target - prev) / counts[i] if counts[i] else 0.0
+        out.append(float(bounds[i] + frac * (bounds[i + 1] - bounds[i])))
+    return out
+
+
+class DriftMonitor:
+    def __init__(self, feature_names, categorical_domains, threshold=0.5,
+                 baseline=None, edges=None, prob_bins=20, band=0.05):
+        self.feature_names = list(feature_names)
+        self.threshold = float(threshold)
+        self.band = float(band)
+        self.baseline = baseline or {}
+        self._lock = threading.Lock()
+        self._init_args = (feature_names, categorical_domains, threshold,
+                           baseline, edges, prob_bins, band)
+
+        base_features = self.baseline.get("features", {})
+        edges = edges or {}
+
+        self.numeric = {}
+        self.categorical = {}
+        for j, name in enumerate(self.feature_names):
+            if name in categorical_domains:
+                codes = np.asarray(sorted(categorical_domains[name]), dtype=float)
+                self.categorical[name] = {
+                    "index": j,
+                    "codes": codes,
+                    # last slot counts codes outside the domain
+                    "counts": np.zeros(len(codes) + 1, dtype=np.int64),
+                }
+            else:
+                e = edges.get(name)
+                if e is None:
+                    e = base_features.get(name, {}).get("edges", DEFAULT_EDGES)
+                e = np.asarray(e, dtype=float)
+                self.numeric[name] = {
+                    "index": j,
+                    "edges": e,
+                    "counts": np.zeros(len(e) + 1, dtype=np.int64),
+                    "n": 0, "mean": 0.0, "m2": 0.0,
+                    "min": np.inf, "max": -np.inf,
+                }
+
+        self.prob_edges = np.linspace(0.0, 1.0, prob_bins + 1)[1:-1]
+        self.prob_counts = np.zeros(prob_bins, dtype=np.int64)
+        self.prob_n = 0
+        self.prob_sum = 0.0
+        self.approved = 0
+        self.near_threshold = 0
+        self.rows = 0
+
+    @classmethod
+    def load_baseline(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def update(self, X, final_prob=None):
+        """Fold a scored batch (n, features) into the running state."""
+        X = np.asarray(X, dtype=float)
+        if X.ndim != 2 or len(X) == 0:
+            return
+
+        with self._lock:
+            self.rows += len(X)
+
+            for st in self.numeric.values():
+                col = X[:, st["index"]]
+                col = col[np.isfinite(col)]
+                if not len(col):
+                    continue
+
+                st["counts"] += np.bincount(
+                    np.searchsorted(st["edges"], col, side="right"),
+                    minlength=len(st["counts"]))
+
+                # Chan et al. parallel merge of mean / variance
+                n_b = len(col)
+                mean_b = float(col.mean())
+                m2_b = float(((col - mean_b) ** 2).sum())
+                n_a = st["n"]
+                n = n_a + n_b
+                delta = mean_b - st["mean"]
+                st["mean"] += delta * n_b / n
+                st["m2"] += m2_b + delta * delta * n_a * n_b / n
+                st["n"] = n
+                st["min"] = min(st["min"], float(col.min()))
+                st["max"] = max(st["max"], float(col.max()))
+
+            for st in self.categorical.values():
+                col = X[:, st["index"]]
+                codes = st["codes"]
+                pos = np.searchsorted(codes, col)
+                pos_clipped = np.minimum(pos, len(codes) - 1)
+                known = codes[pos_clipped] == col
+                slots = np.where(known, pos_clipped, len(codes))
+                st["counts"] += np.bincount(slots, minlength=len(st["counts"]))
+
+            if final_prob is not None:
+                p = np.asarray(final_prob, dtype=float)
+                p = p[np.isfinite(p)]
+                self.prob_counts += np.bincount(
+                    np.searchsorted(self.prob_edges, p, side="right"),
+                    minlength=len(self.prob_counts))
+                self.prob_n += len(p)
+                self.prob_sum += float(p.sum())
+                self.approved += int((p >= self.threshold).sum())
+                self.near_threshold += int(
+                    (np.abs(p - self.threshold) <= self.band).sum())
+
+    def empty_copy(self):
+        """New monitor with the same configuration and no rows."""
+        return DriftMonitor(*self._init_args)
+
+    def state(self):
+        """Raw running state as plain JSON types."""
+        def finite(x):
+            return float(x) if np.isfinite(x) else None
+
+        with self._lock:
+            return {
+                "rows": self.rows,
+                "numeric": {
+                    name: {
+                        "counts": st["counts"].tolist(),
+                        "n": st["n"], "mean": st["mean"], "m2": st["m2"],
+                        "min": finite(st["min"]), "max": finite(st["max"]),
+                    }
+                    for name, st in self.numeric.items()
+                },
+                "categorical": {
+                    name: st["counts"].tolist() for name, st in self.categorical.items()
+                },
+                "prob": {
+                    "counts": self.prob_counts.tolist(),
+                    "n": self.prob_n, "sum": self.prob_sum,
+                    "approved": self.approved, "near_threshold": self.near_threshold,
+                },
+            }
+
+    def merge_state(self, other):
+        """Fold a state() from another monitor (same configuration) in."""
+        with self._lock:
+            self.rows += other["rows"]
+
+            for name, o in other["numeric"].items():
+                st = self.numeric[name]
+                st["counts"] += np.asarray(o["counts"], dtype=np.int64)
+                n_b = o["n"]
+                if not n_b:
+                    continue
+                # Chan et al. parallel merge, as in update()
+                n_a = st["n"]
+                n = n_a + n_b
+                delta = o["mean"] - st["mean"]
+                st["mean"] += delta * n_b / n
+                st["m2"] += o["m2"] + delta * delta * n_a * n_b / n
+                st["n"] = n
+                st["min"] = min(st["min"], o["min"])
+                st["max"] = max(st["max"], o["max"])
+
+            for name, counts in other["categorical"].items():
+                self.categorical[name]["counts"] += np.asarray(counts, dtype=np.int64)
+
+            p = other["prob"]
+            self.prob_counts += np.asarray(p["counts"], dtype=np.int64)
+            self.prob_n += p["n"]
+            self.prob_sum += p["sum"]
+            self.approved += p["approved"]
+            self.near_threshold += p["near_threshold"]
+
+    def snapshot(self):
+        base_features = self.baseline.get("features", {})
+
+        with self._lock:
+            features = {}
+            for name, st in self.numeric.items():
+                n = st["n"]
+                q05, q50, q95 = _hist_quantiles(
+                    st["edges"], st["counts"], st["min"], st["max"],
+                    (0.05, 0.5, 0.95)) if n else (None, None, None)
+                expected = base_features.get(name, {}).get("proportions")
+                features[name] = {
+                    "type": "numeric",
+                    "count": n,
+                    "mean": st["mean"] if n else None,
+                    "std": float(np.sqrt(st["m2"] / n)) if n else None,
+                    "min": st["min"] if n else None,
+                    "max": st["max"] if n else None,
+                    "p05": q05, "p50": q50, "p95": q95,
+                    "psi": psi(st["counts"], expected) if expected and n else None,
+                }
+
+            for name, st in self.categorical.items():
+                counts = st["counts"]
+                expected = base_features.get(name, {}).get("proportions")
+                features[name] = {
+                    "type": "categorical",
+                    "counts": {
+                        str(int(c)): int(k) for c, k in zip(st["codes"], counts[:-1])
+                    },
+                    "unknown": int(counts[-1]),
+                    "psi": psi(counts, expected) if expected and counts.sum() else None,
+                }
+
+            expected = self.baseline.get("final_prob", {}).get("proportions")
+            prob = {
+                "count": self.prob_n,
+                "mean": self.prob_sum / self.prob_n if self.prob_n else None,
+                "threshold": self.threshold,
+                "approval_rate": self.approved / self.prob_n if self.prob_n else None,
+                "near_threshold_rate": self.near_threshold / self.prob_n if self.prob_n else None,
+                "histogram": self.prob_counts.tolist(),
+                "psi": psi(self.prob_counts, expected) if expected and self.prob_n else None,
+            }
+
+            return {"rows": self.rows, "features": features, "final_prob": prob}
+
+    def export_baseline(self):
+        """Bin edges + proportions of the current state, for use as a baseline."""
+        with self._lock:
+            features = {}
+            for name, st in self.numeric.items():
+                total = max(int(st["counts"].sum()), 1)
+                features[name] = {
+                    "edges": st["edges"].tolist(),
+                    "proportions": (st["counts"] / total).tolist(),
+                }
+            for name, st in self.categorical.items():
+                total = max(int(st["counts"].sum()), 1)
+                features[name] = {
+                    "codes": st["codes"].tolist(),
+                    "proportions": (st["counts"] / total).tolist(),
+                }
+
+            out = {"rows": self.rows, "features": features}
+            if self.prob_n:
+                out["final_prob"] = {
+                    "proportions": (self.prob_counts / self.prob_n).tolist()
+                }
+            return out
@@ -0,0 +1,135 @@
+# report_cache.py file
+#
+# Content-addressed on-disk cache of rendered PDF reports. Each entry is
+# <key>.pdf plus a small <key>.json sidecar (the scores behind the report).
+# When the directory grows past max_bytes, the least recently used entries
+# are evicted until it is back under 90% of the limit.
+#
+# Entries are served as open files; PatchedReader overlays same-length
+# byte patches (the date/time stamp) while the file is read in chunks,
+# so a hit never holds the whole PDF in memory.
+
+import io
+import os
+import json
+import threading
+
+
+class PatchedReader(io.RawIOBase):
+    """Read-only stream over `fileobj` with [(offset, bytes), ...] patches
+    applied on the fly. Patches replace bytes in place (length preserved)."""
+
+    def __init__(self, fileobj, patches):
+        self._f = fileobj
+        self._patches = sorted(patches)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = self._f.readinto(b)
+        if not n:
+            return 0
+
+        start, end = self._pos, self._pos + n
+        view = memoryview(b)
+        for off, data in self._patches:
+            if off >= end:
+                break
+            lo, hi = max(off, start), min(off + len(data), end)
+            if lo < hi:
+                view[lo - start:hi - start] = data[lo - off:hi - off]
+
+        self._pos = end
+        return n
+
+    def close(self):
+        try:
+            self._f.close()
+        finally:
+            super().close()
+
+
+class ReportCache:
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._size = self._scan_size()
+
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".pdf", base + ".json"
+
+    def _scan_size(self):
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                total += entry.stat().st_size
+        return total
+
+    def open(self, key):
+        """Return (open binary file, meta) or None. The caller closes the
+        file; an entry evicted meanwhile stays readable until then."""
+        pdf_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            pdf = open(pdf_path, "rb")
+            # mtime doubles as the LRU clock
+            os.utime(pdf_path)
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return pdf, meta
+
+    def put(self, key, pdf, meta):
+        pdf_path, meta_path = self._paths(key)
+        meta_bytes = json.dumps(meta).encode("utf-8")
+
+        # write-then-rename so concurrent readers never see partial files
+        for path, data in ((meta_path, meta_bytes), (pdf_path, pdf)):
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+        with self._lock:
+            self._size += len(pdf) + len(meta_bytes)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Re-scan: other worker processes share the directory
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".pdf"):
+                st = entry.stat()
+                key = entry.name[:-4]
+                meta_path = self._paths(key)[1]
+                meta_size = os.path.getsize(meta_path) if os.path.exists(meta_path) else 0
+                entries.append((st.st_mtime, key, st.st_size + meta_size))
+                total += st.st_size + meta_size
+
+        entries.sort()
+        target = int(self.max_bytes * 0.9)
+        for _, key, size in entries:
+            if total <= target:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            self.stats["evictions"] += 1
+
+        self._size = total
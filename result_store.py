@@ -0,0 +1,215 @@
+# result_store.py file
+#
+# Server-side store for uploaded and scored batches, so the browser only
+# fetches the page it is showing. Each batch is one SQLite file:
+#
+#   <dir>/<batch_id>.sqlite
+#     rows : row, ok, error, decision, risk_percentage, confidence_score,
+#            baseline_decision, baseline_risk_percentage, <features...>, raw
+#     meta : key / value (columns of the upload, counts, model version)
+#
+# Sort and filter columns are whitelisted (never interpolated from the
+# request) and every filterable column is indexed. The newest `keep`
+# batches are kept.
+
+import os
+import json
+import sqlite3
+import threading
+
+import numpy as np
+
+
+INSERT_CHUNK = 5000
+MAX_PAGE_SIZE = 500
+
+SCORE_COLUMNS = (
+    "decision", "risk_percentage", "confidence_score",
+    "baseline_decision", "baseline_risk_percentage",
+)
+
+
+class ResultStore:
+    def __init__(self, directory, feature_names, keep=50):
+        self.directory = directory
+        self.feature_names = list(feature_names)
+        self.keep = keep
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+        # Request parameters only ever select from these
+        self.sortable = ("row",) + SCORE_COLUMNS + tuple(self.feature_names)
+        self.filterable = SCORE_COLUMNS + tuple(self.feature_names)
+
+    def _path(self, batch_id):
+        # ids are generated here (uuid hex); reject anything else
+        if not batch_id or not all(c in "0123456789abcdef" for c in batch_id):
+            raise KeyError(batch_id)
+        return os.path.join(self.directory, f"{batch_id}.sqlite")
+
+    def _connect(self, path):
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def create(self, batch_id, columns, values, meta):
+        """Write one batch. `columns` maps SQL column -> array (one per row);
+        `values` is the original row dicts, kept as JSON for display."""
+        path = self._path(batch_id)
+        tmp = f"{path}.{os.getpid()}.tmp"
+
+        names = ["row", "ok", "error"] + list(SCORE_COLUMNS) + self.feature_names
+        feature_cols = ", ".join(f'"{f}" REAL' for f in self.feature_names)
+
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE rows ("
+                "row INTEGER PRIMARY KEY, ok INTEGER, error TEXT, "
+                "decision INTEGER, risk_percentage REAL, confidence_score REAL, "
+                "baseline_decision INTEGER, baseline_risk_percentage REAL, "
+                f"{feature_cols}, raw TEXT)"
+            )
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+
+            n = len(values)
+            data = []
+            for name in names[1:]:
+                col = np.asarray(columns[name])
+                if col.dtype.kind == "f":
+                    col = np.where(np.isnan(col), None, col)
+                data.append(col.tolist())
+
+            quoted = ", ".join(f'"{c}"' for c in names + ["raw"])
+            placeholders = ", ".join("?" for _ in range(len(names) + 1))
+            for start in range(0, n, INSERT_CHUNK):
+                stop = min(start + INSERT_CHUNK, n)
+                conn.executemany(
+                    f"INSERT INTO rows ({quoted}) VALUES ({placeholders})",
+                    zip(range(start, stop),
+                        *(d[start:stop] for d in data),
+                        (json.dumps(v, default=str) for v in values[start:stop]))
+                )
+
+            # Indexes are built after the bulk insert (much cheaper)
+            for c in self.filterable:
+                conn.execute(f'CREATE INDEX "ix_{c}" ON rows ("{c}")')
+            conn.execute("CREATE INDEX ix_decision_risk ON rows (decision, risk_percentage)")
+
+            conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [(k, json.dumps(v)) for k, v in meta.items()]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        os.replace(tmp, path)
+        self._prune()
+
+    def _prune(self):
+        with self._lock:
+            entries = sorted(
+                (e for e in os.scandir(self.directory) if e.name.endswith(".sqlite")),
+                key=lambda e: e.stat().st_mtime,
+                reverse=True
+            )
+            for e in entries[self.keep:]:
+                for suffix in ("", "-wal", "-shm"):
+                    try:
+                        os.remove(e.path + suffix)
+                    except OSError:
+                        pass
+
+    def delete(self, batch_id):
+        path = self._path(batch_id)
+        if not os.path.exists(path):
+            raise KeyError(batch_id)
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(path + suffix)
+            except OSError:
+                pass
+
+    def meta(self, batch_id):
+        path = self._path(batch_id)
+        if not os.path.exists(path):
+            raise KeyError(batch_id)
+        conn = self._connect(path)
+        try:
+            return {k: json.loads(v) for k, v in conn.execute("SELECT key, value FROM meta")}
+        finally:
+            conn.close()
+
+    def page(self, batch_id, page=1, page_size=50, sort="row", order="asc",
+             filters=None):
+        """One page of rows plus the filtered total.
+
+        filters: {"ok": 0/1, "decision": 0/1, "<col>_min": x, "<col>_max": x}
+        where <col> is one of self.filterable.
+        """
+        path = self._path(batch_id)
+        if not os.path.exists(path):
+            raise KeyError(batch_id)
+
+        if sort not in self.sortable:
+            raise ValueError(f"Cannot sort by: {sort}")
+        order = "DESC" if str(order).lower() == "desc" else "ASC"
+        page = max(1, int(page))
+        page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+
+        where, params = [], []
+        for key, value in (filters or {}).items():
+            if key in ("ok", "decision"):
+                where.append(f'"{key}" = ?')
+                params.append(int(value))
+                continue
+            col, _, bound = key.rpartition("_")
+            if col not in self.filterable or bound not in ("min", "max"):
+                raise ValueError(f"Unknown filter: {key}")
+            where.append(f'"{col}" {">=" if bound == "min" else "<="} ?')
+            params.append(float(value))
+
+        where_sql = ("WHERE " + " AND ".join(where)) if where else ""
+
+        conn = self._connect(path)
+        try:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM rows {where_sql}", params).fetchone()[0]
+
+            # NULLs (invalid rows) always sort last; row keeps ties stable
+            cur = conn.execute(
+                f'SELECT row, ok, error, decision, risk_percentage, confidence_score, '
+                f'baseline_decision, baseline_risk_percentage, raw FROM rows {where_sql} '
+                f'ORDER BY "{sort}" IS NULL, "{sort}" {order}, row ASC LIMIT ? OFFSET ?',
+                params + [page_size, (page - 1) * page_size]
+            )
+            rows = []
+            for r in cur:
+                rows.append({
+                    "row": r[0],
+                    "ok": bool(r[1]),
+                    "error": r[2] or None,
+                    "decision": r[3],
+                    "risk_percentage": r[4],
+                    "confidence_score": r[5],
+                    "baseline_decision": r[6],
+                    "baseline_risk_percentage": r[7],
+                    "values": json.loads(r[8]),
+                })
+        finally:
+            conn.close()
+
+        return {
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+            "pages": max(1, -(-total // page_size)),
+            "sort": sort,
+            "order": order.lower(),
+            "rows": rows,
+        }
@@ -0,0 +1,155 @@
+# runtime_governor.py file
+#
+# Thread-count governance for concurrent serving. Models unpickled from
+# training often carry n_jobs=-1 / nthread=0, so every request thread
+# would spin a full-size pool in sklearn, XGBoost and BLAS at once. The
+# governor gives each request thread an equal share of the cores:
+#
+#   native threads per request = cpu_count // (workers * threads)
+#
+# serve.py imports _env_int and native_thread_count from here, before
+# numpy is loaded, so the environment it pins and the caps set on the
+# models come from one formula.
+#
+# It also wraps the SHAP explainers in locks (they are not safe to call
+# from several threads at once) and counts how long callers wait for them.
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+
+def _env_int(name, default):
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def native_thread_count(workers, threads, cpus=None):
+    """Cores per request thread; LOAN_NATIVE_THREADS overrides."""
+    cpus = cpus or os.cpu_count() or 1
+    return _env_int("LOAN_NATIVE_THREADS", max(1, cpus // (workers * threads)))
+
+
+class GuardedExplainer:
+    """Serializes calls to a non-thread-safe explainer and records waits."""
+
+    def __init__(self, name, explainer):
+        self.name = name
+        self.explainer = explainer
+        self._lock = threading.Lock()
+        self.stats = {
+            "calls": 0, "contended": 0,
+            "wait_seconds": 0.0, "max_wait_seconds": 0.0,
+            "busy_seconds": 0.0,
+        }
+
+    def __call__(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        contended = not self._lock.acquire(blocking=False)
+        if contended:
+            self._lock.acquire()
+        t1 = time.perf_counter()
+        try:
+            return self.explainer(*args, **kwargs)
+        finally:
+            # stats are updated while still holding the lock
+            wait = t1 - t0
+            st = self.stats
+            st["calls"] += 1
+            st["contended"] += int(contended)
+            st["wait_seconds"] += wait
+            st["max_wait_seconds"] = max(st["max_wait_seconds"], wait)
+            st["busy_seconds"] += time.perf_counter() - t1
+            self._lock.release()
+
+    def __getattr__(self, item):
+        return getattr(self.explainer, item)
+
+
+class RuntimeGovernor:
+    def __init__(self, workers=None, threads=None, cpus=None):
+        self.cpus = cpus or os.cpu_count() or 1
+        self.workers = workers or _env_int("LOAN_WORKERS", 1)
+        self.threads = threads or _env_int("LOAN_THREADS", 1)
+        self.native_threads = native_thread_count(
+            self.workers, self.threads, self.cpus)
+
+        self.explainers = {}
+        self.configured = []
+
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self.stats = {"scoring_calls": 0, "max_inflight": 0}
+
+    def configure_models(self, models):
+        """Cap n_jobs / nthread on every loaded estimator."""
+        k = self.native_threads
+        for name, model in models.items():
+            if model is None:
+                continue
+            try:
+                params = model.get_params() if hasattr(model, "get_params") else {}
+                if "n_jobs" in params:
+                    model.set_params(n_jobs=k)
+                if "nthread" in params:
+                    model.set_params(nthread=k)
+                # XGBoost keeps its own copy on the booster
+                if hasattr(model, "get_booster"):
+                    model.get_booster().set_param({"nthread": k})
+                self.configured.append(name)
+            except Exception as e:
+                print(f"⚠️ Thread config failed for {name}: {e}")
+
+        # BLAS / OpenMP pools that were not pinned through the environment
+        if threadpool_limits is not None:
+            threadpool_limits(limits=k)
+
+    def guard(self, name, explainer):
+        if explainer is None:
+            return None
+        guarded = GuardedExplainer(name, explainer)
+        self.explainers[name] = guarded
+        return guarded
+
+    @contextmanager
+    def scoring(self):
+        """Count a scoring call as in flight. Bookkeeping only: nothing
+        waits here, concurrency is bounded by the gunicorn threads."""
+        with self._lock:
+            self._inflight += 1
+            self.stats["scoring_calls"] += 1
+            self.stats["max_inflight"] = max(
+                self.stats["max_inflight"], self._inflight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    def snapshot(self):
+        with self._lock:
+            inflight = self._inflight
+            stats = dict(self.stats)
+
+        return {
+            "pid": os.getpid(),
+            "cpus": self.cpus,
+            "workers": self.workers,
+            "threads_per_worker": self.threads,
+            "native_threads_per_request": self.native_threads,
+            "threadpoolctl": threadpool_limits is not None,
+            "configured_models": list(self.configured),
+            "scoring_inflight": inflight,
+            **stats,
+            "explainers": {
+                name: dict(g.stats) for name, g in self.explainers.items()
+            },
+        }
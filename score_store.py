@@ -0,0 +1,156 @@
+# score_store.py file
+#
+# Persistent store of per-row model scores for incremental re-scoring.
+# Rows are keyed by (model_version, fingerprint), where the fingerprint is
+# a 64-bit hash of the encoded feature values, so a re-uploaded customer
+# base only sends new or changed rows through the models. A new model
+# version never sees scores written by an older one. Rows of other
+# versions are only deleted on request (purge_other_versions, see
+# scripts/purge_score_store.py).
+#
+#   <path>  SQLite, WAL mode; one table, clustered on the key
+
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+PROB_COLUMNS = ("rf_prob", "xgb_prob", "final_prob", "baseline_prob")
+DECISION_COLUMNS = ("decision", "baseline_decision")
+
+# SQLite's default limit on bound parameters is 999 on older builds
+LOOKUP_CHUNK = 900
+
+
+def row_fingerprints(df):
+    """uint64 hash per row of an encoded feature frame (column order matters)."""
+    hashed = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    # SQLite integers are signed 64-bit
+    return hashed.view(np.int64)
+
+
+class ScoreStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "written": 0}
+
+    def _connection(self):
+        # Connections do not survive fork: reopen in each worker
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "model_version TEXT NOT NULL, fp INTEGER NOT NULL, "
+            "rf_prob REAL, xgb_prob REAL, final_prob REAL, baseline_prob REAL, "
+            "decision INTEGER, baseline_decision INTEGER, "
+            "PRIMARY KEY (model_version, fp)) WITHOUT ROWID"
+        )
+        self._conn = conn
+        self._pid = os.getpid()
+        return conn
+
+    def lookup(self, model_version, fps):
+        """Return (hit mask, scores) for fingerprints; misses hold NaN / -1."""
+        fps = np.asarray(fps, dtype=np.int64)
+        n = len(fps)
+
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            unique = np.unique(fps).tolist()
+            for start in range(0, len(unique), LOOKUP_CHUNK):
+                chunk = unique[start:start + LOOKUP_CHUNK]
+                placeholders = ", ".join("?" for _ in chunk)
+                cur = conn.execute(
+                    f"SELECT fp, {', '.join(PROB_COLUMNS + DECISION_COLUMNS)} "
+                    f"FROM scores WHERE model_version = ? AND fp IN ({placeholders})",
+                    [model_version] + chunk
+                )
+                for row in cur:
+                    found[row[0]] = row[1:]
+
+        hit = np.fromiter((fp in found for fp in fps.tolist()), dtype=bool, count=n)
+
+        scores = {name: np.full(n, np.nan) for name in PROB_COLUMNS}
+        scores.update({name: np.full(n, -1, dtype=np.int8) for name in DECISION_COLUMNS})
+        if hit.any():
+            values = np.array(
+                [found[fp] for fp in fps[hit].tolist()], dtype=float)
+            for j, name in enumerate(PROB_COLUMNS + DECISION_COLUMNS):
+                col = values[:, j]
+                if name in DECISION_COLUMNS:
+                    col = np.where(np.isnan(col), -1, col).astype(np.int8)
+                scores[name][hit] = col
+
+        self.stats["lookups"] += 1
+        self.stats["hits"] += int(hit.sum())
+        self.stats["misses"] += n - int(hit.sum())
+        return hit, scores
+
+    def put(self, model_version, fps, scores):
+        """Upsert freshly computed scores (arrays aligned with fps)."""
+        fps = np.asarray(fps, dtype=np.int64)
+        n = len(fps)
+        if n == 0:
+            return
+
+        # Missing models -> NULL
+        columns = []
+        for name in PROB_COLUMNS:
+            col = np.asarray(scores[name], dtype=float) if name in scores else np.full(n, np.nan)
+            columns.append(np.where(np.isnan(col), None, col).tolist())
+        for name in DECISION_COLUMNS:
+            col = np.asarray(scores[name]) if name in scores else None
+            columns.append(col.astype(int).tolist() if col is not None else [None] * n)
+
+        names = ("model_version", "fp") + PROB_COLUMNS + DECISION_COLUMNS
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO scores ({', '.join(names)}) "
+                    f"VALUES ({', '.join('?' for _ in names)})",
+                    zip([model_version] * n, fps.tolist(), *columns)
+                )
+        self.stats["written"] += n
+
+    def purge_other_versions(self, model_version):
+        """Drop scores written by any other model version."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                cur = conn.execute(
+                    "DELETE FROM scores WHERE model_version != ?", (model_version,))
+        return cur.rowcount
+
+    def close(self):
+        """Close this process's connection, e.g. before gunicorn forks."""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._pid = None
+
+    def count(self, model_version=None):
+        with self._lock:
+            conn = self._connection()
+            if model_version is None:
+                return conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+            return conn.execute(
+                "SELECT COUNT(*) FROM scores WHERE model_version = ?",
+                (model_version,)).fetchone()[0]
@@ -0,0 +1,79 @@
+# scripts/bench_json.py file
+#
+# Microbenchmark for /predict response serialization with full SHAP items.
+#
+#   python scripts/bench_json.py [iterations]
+#
+# "legacy" is the old path (convert_numpy_types walk + json.dumps with
+# NumpyEncoder); "current" is app._json_dumps on the native-typed payload
+# the inference pipeline now emits (orjson when installed).
+
+import os
+import sys
+import json
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+def build_payload(seed=0):
+    rng = np.random.default_rng(seed)
+    features = app.INPUT_ORDER
+
+    def items():
+        return app._impact_to_100(
+            app._shap_to_json(features, rng.normal(0, 0.05, len(features))))
+
+    return {
+        "enhanced_model": {
+            "loan_status": "Approved",
+            "risk_percentage": 23.41,
+            "rf_probability": 74.12,
+            "xgb_probability": 79.03,
+            "confidence_score": 76.59,
+            "model_type": "enhanced_blend"
+        },
+        "baseline_model": {
+            "loan_status": "Approved",
+            "risk_percentage": 31.0,
+            "rf_probability": 69.0,
+            "confidence_score": 69.0,
+            "model_type": "baseline_rf"
+        },
+        "baseline_explainability": {"method": "shap", "items": items()},
+        "enhanced_explainability_16": {
+            "method": "shap",
+            "blend_weight": 0.6,
+            "items": items()
+        }
+    }
+
+
+def legacy_dumps(result):
+    return json.dumps(app.convert_numpy_types(result), cls=app.NumpyEncoder)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    payload = build_payload()
+
+    assert json.loads(legacy_dumps(payload)) == json.loads(
+        app._json_dumps(payload))
+
+    backend = "orjson" if app.orjson is not None else "stdlib json"
+    legacy = timeit.timeit(lambda: legacy_dumps(payload), number=iterations)
+    current = timeit.timeit(lambda: app._json_dumps(payload), number=iterations)
+
+    print(f"payload: {len(app._json_dumps(payload))} bytes, "
+          f"{iterations} iterations")
+    print(f"legacy  : {legacy / iterations * 1e6:8.2f} us/response")
+    print(f"current : {current / iterations * 1e6:8.2f} us/response ({backend})")
+    print(f"speedup : {legacy / current:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
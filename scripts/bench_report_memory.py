@@ -0,0 +1,86 @@
+# scripts/bench_report_memory.py file
+#
+# Peak Python memory for bulk report generation (tracemalloc).
+#
+#   python scripts/bench_report_memory.py [reports]
+#
+# "legacy" scores each row, renders its PDF to bytes (BytesIO + getvalue)
+# and builds the bundle in an in-memory ZIP copied out with getvalue(), as
+# the old routes did. The other rows run app._render_report_bundle(), the
+# code behind /report-bundle: without the report cache, with a cold cache
+# (every report rendered and stored) and with a warm cache (every report
+# streamed from its cached template).
+
+import os
+import sys
+import time
+import zipfile
+import tempfile
+import tracemalloc
+from io import BytesIO
+
+# Keep the benchmark's audit rows and cache entries out of the real ones
+os.environ.setdefault("LOAN_AUDIT", "0")
+os.environ["LOAN_REPORT_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench-reports-")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+def sample_input(i):
+    row = {k: 1 for k in app.INPUT_ORDER}
+    row["age"] = 20 + (i % 50)
+    row["balance"] = 100 * i
+    return row
+
+
+def legacy_bundle(rows):
+    buff = BytesIO()
+    with zipfile.ZipFile(buff, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for i, data in enumerate(rows):
+            result, _ = app._run_inference_and_explain(data)
+            pdf, _ = app._build_pdf_bytes(result, data)
+            zf.writestr(f"report_{i:05d}.pdf", BytesIO(pdf).getvalue())
+    return len(buff.getvalue())
+
+
+def served_bundle(rows):
+    out = app._render_report_bundle(rows, source="bench")
+    out.seek(0, os.SEEK_END)
+    size = out.tell()
+    out.close()
+    return size
+
+
+def measure(fn, rows):
+    tracemalloc.start()
+    t = time.perf_counter()
+    size = fn(rows)
+    elapsed = time.perf_counter() - t
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, peak, elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rows = [sample_input(i) for i in range(n)]
+    cache = app.report_cache
+
+    runs = [("legacy", legacy_bundle, None)]
+    runs += [("no cache", served_bundle, None)]
+    if cache is not None:
+        runs += [("cold cache", served_bundle, cache),
+                 ("warm cache", served_bundle, cache)]
+
+    print(f"{n} reports")
+    for name, fn, report_cache in runs:
+        app.report_cache = report_cache
+        size, peak, elapsed = measure(fn, rows)
+        print(f"{name:10s}: bundle {size / 1024:9.1f} KiB, "
+              f"peak {peak / 1024 / 1024:7.2f} MiB, {elapsed:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# scripts/build_drift_baseline.py file
+#
+# Build the reference distribution used for PSI by /monitoring/drift.
+#
+#   python scripts/build_drift_baseline.py training.csv [out.json] [--no-score]
+#
+# Numeric features get decile bin edges taken from the CSV; categorical
+# features use their VALUE_MAP domains. Unless --no-score is given, the
+# rows are also scored so the blend probability distribution is included.
+# Raw-label CSVs are accepted (same encoding as /predict-csv).
+
+import os
+import sys
+import json
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+from drift_monitor import DriftMonitor  # noqa: E402
+
+
+def decile_edges(values):
+    edges = np.unique(np.quantile(values, np.linspace(0.1, 0.9, 9)))
+    return edges.tolist()
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args:
+        print(__doc__ or "usage: build_drift_baseline.py training.csv [out.json]")
+        return 1
+
+    src = args[0]
+    out = args[1] if len(args) > 1 else app.DRIFT_BASELINE_PATH
+    score = "--no-score" not in sys.argv
+
+    raw = pd.read_csv(src, skipinitialspace=True)
+    raw.columns = [str(c).strip().lower() for c in raw.columns]
+    df, ok, errors = app._validate_rows(raw)
+    X = df[ok]
+    print(f"✓ {int(ok.sum())} valid rows ({int((~ok).sum())} rejected)")
+
+    categorical = {n: app.VALUE_MAP[n] for n in app.INPUT_SCHEMA["categorical"]}
+    edges = {
+        name: decile_edges(X[name].to_numpy())
+        for name in app.INPUT_SCHEMA["columns"] if name not in categorical
+    }
+
+    monitor = DriftMonitor(
+        app.INPUT_SCHEMA["columns"], categorical,
+        threshold=app.threshold if app.artifact else 0.5,
+        edges=edges
+    )
+
+    final_prob = None
+    if score:
+        scores, _ = app._score_frame(X)
+        final_prob = scores.get("final_prob", scores.get("baseline_prob"))
+    monitor.update(X.to_numpy(dtype=float), final_prob)
+
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(monitor.export_baseline(), f, indent=2)
+    print(f"✓ Baseline written to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
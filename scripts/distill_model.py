@@ -0,0 +1,147 @@
+# scripts/distill_model.py file
+#
+# Distill the enhanced stack (rf_feature_model -> rf_best + xgb_best,
+# blended by blend_weight) into one compact gradient-boosted model that
+# can serve as a fast screening tier for batch scoring.
+#
+#   python scripts/distill_model.py data.csv [--augment 4] [--out PATH]
+#   python scripts/distill_model.py --synthetic 50000
+#
+# The student is a shallow HistGradientBoostingRegressor trained on the
+# logit of the blend probability. It bins features into uint8 histograms
+# and stores float thresholds, so it is small and fast. Agreement and
+# probability error against the blend are reported on a held-out split.
+# Serve it with /predict-batch?tier=fast.
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.ensemble import HistGradientBoostingRegressor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+EPS = 1e-6
+
+
+def _arg(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
+def load_inputs(path):
+    raw = pd.read_csv(path, skipinitialspace=True)
+    raw.columns = [str(c).strip().lower() for c in raw.columns]
+    df, ok, _ = app._validate_rows(raw)
+    return df[ok].reset_index(drop=True)
+
+
+def augment(df, factor, seed=0):
+    # Resample each column independently: covers combinations that are
+    # rare in the real data, which is where student and teacher diverge
+    rng = np.random.default_rng(seed)
+    n = len(df) * factor
+    return pd.DataFrame({
+        c: rng.choice(df[c].to_numpy(), size=n) for c in df.columns
+    })
+
+
+def teacher_prob(X):
+    scores, _ = app._score_frame(X)
+    return scores["final_prob"]
+
+
+def logit(p):
+    p = np.clip(p, EPS, 1 - EPS)
+    return np.log(p / (1 - p))
+
+
+def student_prob(model, X):
+    return 1.0 / (1.0 + np.exp(-model.predict(X)))
+
+
+def main():
+    if not (app.artifact and app.rf_feature_model):
+        print("✗ Enhanced model not loaded; nothing to distill")
+        return 1
+
+    positional = [a for a in sys.argv[1:] if not a.startswith("--")
+                  and sys.argv[sys.argv.index(a) - 1] not in ("--augment", "--out", "--synthetic")]
+    out = _arg("--out", app.DISTILLED_ARTIFACT_PATH)
+    factor = int(_arg("--augment", "4"))
+
+    if positional:
+        base = load_inputs(positional[0])
+        X = pd.concat([base, augment(base, factor)], ignore_index=True)
+    else:
+        from make_dummy_artifacts import synthetic_frame
+        X, _ = synthetic_frame(int(_arg("--synthetic", "50000")), seed=7)
+        X = X.astype(float)
+    X = X[app.feature_names].astype(float)
+    print(f"✓ {len(X)} training rows")
+
+    y_prob = teacher_prob(X)
+
+    rng = np.random.default_rng(0)
+    test = rng.random(len(X)) < 0.2
+    X_train, X_test = X[~test], X[test]
+
+    categorical = [name in app.VALUE_MAP for name in app.feature_names]
+    model = HistGradientBoostingRegressor(
+        max_depth=4,
+        max_iter=120,
+        learning_rate=0.2,
+        categorical_features=categorical,
+        early_stopping=True,
+        random_state=0
+    ).fit(X_train, logit(y_prob[~test]))
+
+    p_student = student_prob(model, X_test)
+    p_teacher = y_prob[test]
+    err = np.abs(p_student - p_teacher)
+    agree = (p_student >= app.threshold) == (p_teacher >= app.threshold)
+
+    t = time.perf_counter()
+    teacher_prob(X_test)
+    t_teacher = time.perf_counter() - t
+    t = time.perf_counter()
+    student_prob(model, X_test)
+    t_student = time.perf_counter() - t
+
+    metrics = {
+        "holdout_rows": int(test.sum()),
+        "decision_agreement": float(agree.mean()),
+        "prob_mae": float(err.mean()),
+        "prob_p99_abs_error": float(np.quantile(err, 0.99)),
+        "prob_max_abs_error": float(err.max()),
+        "speedup": float(t_teacher / t_student) if t_student else None,
+    }
+
+    print(f"decision agreement : {metrics['decision_agreement'] * 100:.2f}%")
+    print(f"probability MAE    : {metrics['prob_mae']:.4f}")
+    print(f"p99 / max abs error: {metrics['prob_p99_abs_error']:.4f} / "
+          f"{metrics['prob_max_abs_error']:.4f}")
+    print(f"scoring time       : blend {t_teacher * 1000:.1f} ms vs "
+          f"distilled {t_student * 1000:.1f} ms ({metrics['speedup']:.1f}x)")
+
+    joblib.dump({
+        "distilled_model": model,
+        "feature_names": list(app.feature_names),
+        "threshold": float(app.threshold),
+        "target": "logit",
+        "teacher_version": app.MODEL_VERSION,
+        "metrics": metrics,
+    }, out)
+    print(f"✓ Distilled artifact written to {out} "
+          f"({os.path.getsize(out) / 1024:.0f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,154 @@
+# scripts/load_test.py file
+#
+# Open-loop load generator for a running server. Requests are issued on a
+# fixed schedule at the target QPS (independent of response times, so
+# queueing shows up in latency) and spread round-robin over the endpoints.
+# Latency is measured from the scheduled send time, so time spent waiting
+# for a free client thread counts too; sends that started more than
+# --late-ms after their slot are reported.
+#
+#   python scripts/load_test.py --url http://127.0.0.1:5000 --qps 50 --duration 30
+#   python scripts/load_test.py --endpoints predict,report --batch-rows 200
+#
+# Pair with scripts/make_dummy_artifacts.py to test without real models.
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Category sizes per VALUE_MAP; numeric ranges roughly match the dataset
+CATEGORIES = {
+    "job": 12, "marital": 3, "education": 4, "default": 2, "housing": 2,
+    "loan": 2, "contact": 3, "month": 12, "poutcome": 4,
+}
+NUMERIC = {
+    "age": (18, 90), "balance": (-500, 20000), "day": (1, 31),
+    "duration": (0, 3000), "campaign": (1, 20), "pdays": (-1, 800),
+    "previous": (0, 10),
+}
+
+
+def random_row(rng):
+    row = {k: rng.randrange(n) for k, n in CATEGORIES.items()}
+    row.update({k: rng.randint(lo, hi) for k, (lo, hi) in NUMERIC.items()})
+    return row
+
+
+def random_csv(rng, n):
+    cols = list(NUMERIC) + list(CATEGORIES)
+    lines = [",".join(cols)]
+    for _ in range(n):
+        row = random_row(rng)
+        lines.append(",".join(str(row[c]) for c in cols))
+    return "\n".join(lines).encode("utf-8")
+
+
+def build_request(endpoint, base, rng, batch_rows):
+    if endpoint == "health":
+        return urllib.request.Request(base + "/health")
+    if endpoint == "drift":
+        return urllib.request.Request(base + "/monitoring/drift")
+    if endpoint == "predict-csv":
+        return urllib.request.Request(
+            base + "/predict-csv", data=random_csv(rng, batch_rows),
+            headers={"Content-Type": "text/csv"})
+
+    if endpoint == "predict-batch":
+        body = {"rows": [random_row(rng) for _ in range(batch_rows)]}
+    else:
+        body = random_row(rng)
+
+    return urllib.request.Request(
+        f"{base}/{endpoint}", data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"})
+
+
+def percentile(sorted_vals, q):
+    if not sorted_vals:
+        return float("nan")
+    i = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[i]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the loan risk API")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--qps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch-rows", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--late-ms", type=float, default=10.0)
+    parser.add_argument(
+        "--endpoints",
+        default="predict,predict-batch,predict-csv,report,report-row,health,drift")
+    args = parser.parse_args()
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    base = args.url.rstrip("/")
+    rng = random.Random(0)
+
+    results = {e: [] for e in endpoints}
+    errors = {e: 0 for e in endpoints}
+    late = {"count": 0, "max": 0.0}
+    lock = threading.Lock()
+
+    def fire(endpoint, req, scheduled):
+        lag = time.perf_counter() - scheduled
+        ok = True
+        try:
+            with urllib.request.urlopen(req, timeout=args.timeout) as resp:
+                resp.read()
+                ok = resp.status < 400
+        except (urllib.error.URLError, OSError):
+            ok = False
+        elapsed = time.perf_counter() - scheduled
+        with lock:
+            results[endpoint].append(elapsed)
+            if not ok:
+                errors[endpoint] += 1
+            if lag * 1000 > args.late_ms:
+                late["count"] += 1
+            late["max"] = max(late["max"], lag)
+
+    total = int(args.qps * args.duration)
+    interval = 1.0 / args.qps
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for i in range(total):
+            endpoint = endpoints[i % len(endpoints)]
+            req = build_request(endpoint, base, rng, args.batch_rows)
+
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, endpoint, req, scheduled)
+
+    wall = time.perf_counter() - start
+
+    print(f"target {args.qps:.1f} qps, sent {total} requests in {wall:.1f}s "
+          f"(achieved {total / wall:.1f} qps)")
+    print(f"{late['count']} sends started more than {args.late_ms:.0f} ms late "
+          f"(max {late['max'] * 1000:.1f} ms); latency includes that wait")
+    print(f"{'endpoint':15s} {'count':>6s} {'errors':>6s} "
+          f"{'p50 ms':>8s} {'p90 ms':>8s} {'p99 ms':>8s} {'max ms':>8s}")
+    for endpoint in endpoints:
+        lat = sorted(results[endpoint])
+        print(f"{endpoint:15s} {len(lat):6d} {errors[endpoint]:6d} "
+              f"{percentile(lat, 0.50) * 1000:8.1f} "
+              f"{percentile(lat, 0.90) * 1000:8.1f} "
+              f"{percentile(lat, 0.99) * 1000:8.1f} "
+              f"{(lat[-1] if lat else float('nan')) * 1000:8.1f}")
+    return 0 if not any(errors.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# scripts/make_dummy_artifacts.py file
+#
+# Generate small synthetic stand-ins for the model artifacts, with the same
+# structure app.py expects, for dry runs and load tests without the real
+# (large) models:
+#
+#   python scripts/make_dummy_artifacts.py [out_dir] [--rows N]
+#   LOAN_MODEL_DIR=model/dry-run python serve.py
+#
+# The models are trained on random data and their predictions mean nothing.
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.ensemble import RandomForestClassifier
+from xgboost import XGBClassifier
+
+FEATURE_NAMES = [
+    "age", "job", "marital", "education", "default", "balance",
+    "housing", "loan", "contact", "day", "month", "duration",
+    "campaign", "pdays", "previous", "poutcome"
+]
+HYBRID_FEATURE_NAME = "rf_oof_proba"
+
+
+def synthetic_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "age": rng.integers(18, 90, n),
+        "job": rng.integers(0, 12, n),
+        "marital": rng.integers(0, 3, n),
+        "education": rng.integers(0, 4, n),
+        "default": rng.integers(0, 2, n),
+        "balance": np.round(rng.lognormal(7, 1.2, n) - 500).astype(int),
+        "housing": rng.integers(0, 2, n),
+        "loan": rng.integers(0, 2, n),
+        "contact": rng.integers(0, 3, n),
+        "day": rng.integers(1, 32, n),
+        "month": rng.integers(0, 12, n),
+        "duration": rng.integers(0, 3000, n),
+        "campaign": rng.integers(1, 20, n),
+        "pdays": np.where(rng.random(n) < 0.75, -1, rng.integers(1, 800, n)),
+        "previous": rng.poisson(0.6, n),
+        "poutcome": rng.integers(0, 4, n),
+    })[FEATURE_NAMES]
+
+    logit = (
+        (df["duration"] - 400) / 250
+        + 1.5 * (df["poutcome"] == 2)
+        - 0.6 * df["housing"]
+        - 0.5 * df["loan"]
+        + df["balance"] / 5000
+        + rng.normal(0, 1, n)
+    )
+    y = (logit > 0).astype(int)
+    return df, y
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    out_dir = args[0] if args else os.path.join("model", "dry-run")
+    rows = 2000
+    if "--rows" in sys.argv:
+        rows = int(sys.argv[sys.argv.index("--rows") + 1])
+
+    X, y = synthetic_frame(rows)
+
+    rf_feature_model = RandomForestClassifier(
+        n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+
+    X_hybrid = X.copy()
+    X_hybrid[HYBRID_FEATURE_NAME] = rf_feature_model.predict_proba(X)[:, 1]
+
+    rf_best = RandomForestClassifier(
+        n_estimators=30, max_depth=6, random_state=1).fit(X_hybrid, y)
+    xgb_best = XGBClassifier(
+        n_estimators=30, max_depth=4, learning_rate=0.2,
+        random_state=2).fit(X_hybrid, y)
+    rf_baseline_model = RandomForestClassifier(
+        n_estimators=30, max_depth=6, random_state=3).fit(X, y)
+
+    os.makedirs(out_dir, exist_ok=True)
+    joblib.dump({
+        "rf_feature_model": rf_feature_model,
+        "rf_best": rf_best,
+        "xgb_best": xgb_best,
+        "blend_weight": 0.5,
+        "feature_names": FEATURE_NAMES,
+        "hybrid_feature_name": HYBRID_FEATURE_NAME,
+        "threshold": 0.5,
+        "model_version": "dry-run",
+    }, os.path.join(out_dir, "enhanced_rf_artifact.pkl"))
+
+    joblib.dump({
+        "rf_baseline_model": rf_baseline_model,
+        "feature_names": FEATURE_NAMES,
+    }, os.path.join(out_dir, "baseline_rf_artifact.pkl"))
+
+    print(f"✓ Dummy artifacts written to {out_dir} ({rows} training rows)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
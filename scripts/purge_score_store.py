@@ -0,0 +1,34 @@
+# scripts/purge_score_store.py file
+#
+# Delete score-store rows written by any model version other than the one
+# app.py loads (LOAN_MODEL_DIR, LOAN_SCORE_STORE_PATH as for the server).
+#
+#   python scripts/purge_score_store.py
+#
+# Nothing is deleted unless both model artifacts load.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+def main():
+    if app.score_store is None:
+        print("✗ Score store is disabled or could not be opened")
+        return 1
+
+    if app.artifact is None or app.baseline_model is None:
+        print("✗ Models not loaded; check LOAN_MODEL_DIR")
+        return 1
+
+    before = app.score_store.count()
+    purged = app._purge_score_store(app.score_store)
+    print(f"✓ Model version {app.MODEL_VERSION}: {before - purged} of {before} rows kept")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
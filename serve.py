@@ -0,0 +1,107 @@
+# serve.py file
+#
+# Production entry point. Pins native thread pools, loads the model
+# artifacts once in the master process and then forks gunicorn workers so
+# the forests are shared copy-on-write instead of being loaded per worker.
+#
+#   python serve.py                      # cpu_count workers x 4 threads
+#   LOAN_WORKERS=4 LOAN_THREADS=8 python serve.py
+
+import os
+import gc
+import multiprocessing
+
+# Only needs the standard library (threadpoolctl is optional), so it is
+# safe to import before the thread env vars are set
+from runtime_governor import _env_int, native_thread_count
+
+
+WORKERS = _env_int("LOAN_WORKERS", multiprocessing.cpu_count())
+THREADS = _env_int("LOAN_THREADS", 4)
+BIND = os.environ.get("LOAN_BIND", "0.0.0.0:5000")
+TIMEOUT = _env_int("LOAN_TIMEOUT", 120)
+
+# Each request thread gets an equal share of the cores for BLAS / OpenMP
+# work, so sklearn, XGBoost and SHAP never oversubscribe the machine.
+NATIVE_THREADS = native_thread_count(WORKERS, THREADS, multiprocessing.cpu_count())
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def _pin_native_threads():
+    # Must run before numpy / sklearn / xgboost are imported
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(NATIVE_THREADS))
+
+    # Layout for app.runtime (RuntimeGovernor), which caps n_jobs / nthread
+    # on the unpickled models as well
+    os.environ["LOAN_WORKERS"] = str(WORKERS)
+    os.environ["LOAN_THREADS"] = str(THREADS)
+
+
+_pin_native_threads()
+
+# Imported after the thread env vars are set: this loads every artifact
+# and builds the SHAP explainers in the master process.
+from app import app  # noqa: E402
+
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    BaseApplication = None
+
+
+if BaseApplication is not None:
+
+    class LoanRiskServer(BaseApplication):
+        def __init__(self, application, options=None):
+            self.application = application
+            self.options = options or {}
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                if key in self.cfg.settings and value is not None:
+                    self.cfg.set(key.lower(), value)
+
+        def load(self):
+            return self.application
+
+
+def main():
+    if BaseApplication is None:
+        print("✗ gunicorn is not installed (pip install gunicorn)")
+        return 1
+
+    # Move everything allocated so far (models, explainers) into the
+    # permanent generation so the collector never touches those pages after
+    # fork; otherwise refcount/GC writes defeat copy-on-write sharing.
+    gc.collect()
+    gc.freeze()
+
+    options = {
+        "bind": BIND,
+        "workers": WORKERS,
+        "threads": THREADS,
+        "worker_class": "gthread",
+        "preload_app": True,
+        "timeout": TIMEOUT,
+    }
+
+    print(
+        f"✓ Serving on {BIND}: {WORKERS} workers x {THREADS} threads "
+        f"({NATIVE_THREADS} native thread(s) per request)"
+    )
+    LoanRiskServer(app, options).run()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+# shap_summary.py file
+#
+# Running portfolio-level SHAP summary. Every explained batch (n, features)
+# is folded into fixed-size state per explainer: sums of signed and
+# absolute contributions, sums of squares, a histogram of each feature's
+# per-row impact percent and how often it was the row's top driver.
+# Memory is O(explainers * features * bins), independent of rows seen.
+#
+# The impact percent matches _shap_to_json(): |contribution| / row total.
+#
+# state() / merge_state() export and fold the raw sums, so the summaries
+# of several worker processes can be combined (shared_state.py).
+
+import threading
+
+import numpy as np
+
+from drift_monitor import _hist_quantiles
+
+
+# 0-100% in 5% steps (inner edges; outer bins are open-ended)
+IMPACT_EDGES = np.arange(5.0, 100.0, 5.0)
+
+
+class ShapAggregator:
+    def __init__(self, feature_names, impact_edges=IMPACT_EDGES):
+        self.feature_names = list(feature_names)
+        self.impact_edges = np.asarray(impact_edges, dtype=float)
+        self._lock = threading.Lock()
+        self._state = {}
+
+    def _new_state(self):
+        p = len(self.feature_names)
+        return {
+            "rows": 0,
+            "sum": np.zeros(p),
+            "sum_abs": np.zeros(p),
+            "sum_sq": np.zeros(p),
+            "positive": np.zeros(p, dtype=np.int64),
+            "top_driver": np.zeros(p, dtype=np.int64),
+            "impact_counts": np.zeros((p, len(self.impact_edges) + 1), dtype=np.int64),
+        }
+
+    def update(self, name, shap_vals):
+        """Fold SHAP values for one explainer, (p,) or (n, p), into the summary."""
+        V = np.asarray(shap_vals, dtype=float)
+        if V.ndim == 1:
+            V = V[None, :]
+        V = V[np.isfinite(V).all(axis=1)]
+        if V.ndim != 2 or len(V) == 0 or V.shape[1] != len(self.feature_names):
+            return
+
+        A = np.abs(V)
+        total = A.sum(axis=1, keepdims=True)
+        impact = np.divide(A, total, out=np.zeros_like(A), where=total > 0) * 100.0
+
+        # bin index per (row, feature) -> one bincount over feature-offset slots
+        n_bins = len(self.impact_edges) + 1
+        slots = np.searchsorted(self.impact_edges, impact, side="right")
+        slots += np.arange(V.shape[1]) * n_bins
+        counts = np.bincount(slots.ravel(), minlength=V.shape[1] * n_bins)
+
+        top = np.bincount(np.argmax(A, axis=1), minlength=V.shape[1])
+
+        with self._lock:
+            st = self._state.get(name)
+            if st is None:
+                st = self._state[name] = self._new_state()
+            st["rows"] += len(V)
+            st["sum"] += V.sum(axis=0)
+            st["sum_abs"] += A.sum(axis=0)
+            st["sum_sq"] += (V * V).sum(axis=0)
+            st["positive"] += (V > 0).sum(axis=0)
+            st["top_driver"] += top
+            st["impact_counts"] += counts.reshape(V.shape[1], n_bins)
+
+    def empty_copy(self):
+        return ShapAggregator(self.feature_names, self.impact_edges)
+
+    def state(self):
+        """Raw sums per explainer as plain JSON types."""
+        with self._lock:
+            return {
+                name: {k: (v.tolist() if isinstance(v, np.ndarray) else v)
+                       for k, v in st.items()}
+                for name, st in self._state.items()
+            }
+
+    def merge_state(self, other):
+        """Fold a state() from another aggregator (same features) in."""
+        with self._lock:
+            for name, o in other.items():
+                st = self._state.get(name)
+                if st is None:
+                    st = self._state[name] = self._new_state()
+                st["rows"] += o["rows"]
+                for key in ("sum", "sum_abs", "sum_sq", "positive",
+                            "top_driver", "impact_counts"):
+                    st[key] += np.asarray(o[key], dtype=st[key].dtype)
+
+    def snapshot(self, top=None):
+        """Per explainer, features ordered by mean |contribution|."""
+        with self._lock:
+            state = {
+                name: {k: (v.copy() if isinstance(v, np.ndarray) else v)
+                       for k, v in st.items()}
+                for name, st in self._state.items()
+            }
+
+        out = {}
+        for name, st in state.items():
+            n = st["rows"]
+            mean = st["sum"] / n
+            mean_abs = st["sum_abs"] / n
+            std = np.sqrt(np.maximum(st["sum_sq"] / n - mean * mean, 0.0))
+            total_abs = float(mean_abs.sum()) or 1.0
+            order = np.argsort(-mean_abs, kind="stable")
+            if top:
+                order = order[:top]
+
+            features = []
+            for j in order.tolist():
+                counts = st["impact_counts"][j]
+                p50, p90 = _hist_quantiles(
+                    self.impact_edges, counts, 0.0, 100.0, (0.5, 0.9))
+                features.append({
+                    "feature": self.feature_names[j],
+                    "mean_abs_contribution": float(mean_abs[j]),
+                    "mean_contribution": float(mean[j]),
+                    "std_contribution": float(std[j]),
+                    "share_percent": float(mean_abs[j] / total_abs * 100.0),
+                    "positive_rate": float(st["positive"][j] / n),
+                    "top_driver_rate": float(st["top_driver"][j] / n),
+                    "impact_p50": p50,
+                    "impact_p90": p90,
+                    "impact_histogram": counts.tolist(),
+                })
+
+            out[name] = {"rows": n, "features": features}
+
+        return {
+            "impact_edges": self.impact_edges.tolist(),
+            "explainers": out,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._state = {}
@@ -0,0 +1,135 @@
+# shared_state.py file
+#
+# Cross-worker view of per-process monitoring state (drift statistics,
+# SHAP summary). Each gunicorn worker keeps its own in-memory state; a
+# background thread writes it as JSON to
+#
+#   <dir>/<kind>-<run_id>-<pid>.json
+#
+# every `interval` seconds when it changed, and the monitoring endpoints
+# merge every file of the current run. run_id is fixed when app.py is
+# imported, so with serve.py (preload_app) all workers share it and files
+# from earlier server runs are ignored. A worker restarted by gunicorn
+# keeps contributing its last published state.
+#
+# Any process importing app.py (scripts, a second server) gets its own
+# run_id, so files of other runs are only removed once their process is
+# gone or they are older than `stale_after`. Running publishers touch
+# their file every interval, which keeps an idle worker's file fresh.
+
+import os
+import json
+import time
+import threading
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class StatePublisher:
+    def __init__(self, directory, kind, run_id, state_fn, interval=2.0,
+                 stale_after=3600.0):
+        self.directory = directory
+        self.kind = kind
+        self.run_id = run_id
+        self.state_fn = state_fn
+        self.interval = interval
+        self.stale_after = stale_after
+
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._thread = None
+        self._pid = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._remove_stale()
+
+    def _path(self, pid=None):
+        return os.path.join(
+            self.directory, f"{self.kind}-{self.run_id}-{pid or os.getpid()}.json")
+
+    def _remove_stale(self):
+        prefix = f"{self.kind}-"
+        current = f"{self.kind}-{self.run_id}-"
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            name = entry.name
+            if not (name.startswith(prefix) and name.endswith(".json")):
+                continue
+            if name.startswith(current):
+                continue
+            try:
+                pid = int(name[:-len(".json")].rpartition("-")[2])
+                # pids get reused: a file nobody touched for long is stale too
+                stale = (not _pid_alive(pid)
+                         or now - entry.stat().st_mtime > self.stale_after)
+                if stale:
+                    os.remove(entry.path)
+            except (OSError, ValueError):
+                continue
+
+    def mark_dirty(self):
+        self._dirty = True
+        self._ensure_thread()
+
+    def _ensure_thread(self):
+        # Threads do not survive fork: (re)start lazily in each worker
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name=f"{self.kind}-publish", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            if self._dirty:
+                self.publish()
+            else:
+                try:
+                    os.utime(self._path())
+                except OSError:
+                    pass
+
+    def publish(self):
+        """Write this process's state now (atomic rename)."""
+        with self._lock:
+            self._dirty = False
+            try:
+                path = self._path()
+                tmp = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self.state_fn(), f)
+                os.replace(tmp, path)
+            except Exception as e:
+                self._dirty = True
+                print(f"⚠️ Publishing {self.kind} state failed: {e}")
+
+    def collect(self):
+        """States of every process in this run, this one freshly published.
+        Returns (states, pids)."""
+        self.publish()
+
+        states, pids = [], []
+        prefix = f"{self.kind}-{self.run_id}-"
+        for entry in os.scandir(self.directory):
+            if not (entry.name.startswith(prefix) and entry.name.endswith(".json")):
+                continue
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    states.append(json.load(f))
+                pids.append(int(entry.name[len(prefix):-len(".json")]))
+            except (OSError, ValueError):
+                continue
+        return states, sorted(pids)
@@ -6,7 +6,30 @@ const errorEl = document.getElementById("error");
 const metaEl = document.getElementById("meta");
 const predictBtn = document.getElementById("predict-btn");
 
-let loadedRows = null;
+// Paging / filter controls
+const filtersEl = document.getElementById("filters");
+const pagerEl = document.getElementById("pager");
+const decisionFilter = document.getElementById("decisionFilter");
+const riskMinInput = document.getElementById("riskMin");
+const riskMaxInput = document.getElementById("riskMax");
+const featureFilter = document.getElementById("featureFilter");
+const featureMinInput = document.getElementById("featureMin");
+const featureMaxInput = document.getElementById("featureMax");
+const applyFiltersBtn = document.getElementById("applyFilters");
+const pageSizeSelect = document.getElementById("pageSize");
+const prevPageBtn = document.getElementById("prevPage");
+const nextPageBtn = document.getElementById("nextPage");
+const pageInfo = document.getElementById("pageInfo");
+
+// Only the head of the file is parsed in the browser (preview); the whole
+// file is uploaded once and scored / stored server-side, then paged.
+const PREVIEW_BYTES = 64 * 1024;
+const PREVIEW_ROWS = 50;
+
+let selectedFile = null;
+let batch = null;
+let query = { page: 1, sort: "row", order: "asc" };
+let lastPage = null;
 
 // Data Loader Functions
 const loader = document.getElementById("loader");
@@ -52,7 +75,10 @@ fileInput.addEventListener("change", async (e) => {
   errorEl.textContent = "";
   metaEl.textContent = "";
   table.innerHTML = "";
-  loadedRows = null;
+  selectedFile = null;
+  batch = null;
+  filtersEl.hidden = true;
+  pagerEl.hidden = true;
 
   const file = e.target.files?.[0];
 
@@ -65,11 +91,12 @@ fileInput.addEventListener("change", async (e) => {
     showLoader("Loading your CSV…", `Reading: ${file.name}`);
     setLoaderProgress(10, "Reading file…");
 
-    const text = await file.text();
+    const text = await file.slice(0, PREVIEW_BYTES).text();
     setLoaderProgress(45, "Parsing CSV…");
 
-    await new Promise((r) => setTimeout(r, 120)); // small UI smoothness
-    const rows = parseCSV(text);
+    let rows = parseCSV(text);
+    // The slice may cut the last line in half
+    if (file.size > PREVIEW_BYTES) rows = rows.slice(0, -1);
 
     if (!rows.length) {
       hideLoader();
@@ -77,16 +104,17 @@ fileInput.addEventListener("change", async (e) => {
       return;
     }
 
-    setLoaderProgress(80, "Rendering table…");
-    await new Promise((r) => setTimeout(r, 120));
+    setLoaderProgress(80, "Rendering preview…");
 
-    loadedRows = rows;
-    renderTable(rows);
+    selectedFile = file;
+    renderTable(rows.slice(0, PREVIEW_ROWS + 1));
 
     setLoaderProgress(100, "Done!");
-    metaEl.innerHTML = `Loaded <code>${file.name}</code> — Rows: <code>${
-      rows.length - 1
-    }</code>, Columns: <code>${rows[0].length}</code>`;
+    metaEl.innerHTML = `Loaded <code>${escapeHtml(file.name)}</code> — Size: <code>${
+      formatBytes(file.size)
+    }</code>, Columns: <code>${rows[0].length}</code> — previewing the first <code>${
+      Math.min(PREVIEW_ROWS, rows.length - 1)
+    }</code> rows`;
 
     predictBtn.disabled = false;
     setTimeout(hideLoader, 200);
@@ -99,7 +127,7 @@ fileInput.addEventListener("change", async (e) => {
 predictBtn.addEventListener("click", async () => {
   errorEl.textContent = "";
 
-  if (!loadedRows || loadedRows.length < 2) {
+  if (!selectedFile) {
     errorEl.textContent = "Upload a CSV first.";
     return;
   }
@@ -107,17 +135,26 @@ predictBtn.addEventListener("click", async () => {
   try {
     predictBtn.disabled = true;
 
-    showLoader("Running prediction…", "Preparing results and generating reports");
-    setLoaderProgress(15, "Validating data…");
-    await new Promise((r) => setTimeout(r, 150));
+    showLoader("Running prediction…", "Uploading and scoring on the server");
+    setLoaderProgress(15, "Uploading file…");
 
-    setLoaderProgress(45, "Predicting records…");
-    await new Promise((r) => setTimeout(r, 200));
+    const form = new FormData();
+    form.append("file", selectedFile);
 
-    setLoaderProgress(75, "Updating table…");
-    await renderPredictedTable(loadedRows);
+    const res = await fetch("/batches", { method: "POST", body: form });
+    if (!res.ok) throw new Error(await res.text());
+
+    setLoaderProgress(75, "Loading first page…");
+    batch = await res.json();
+    query = { page: 1, sort: "row", order: "asc" };
+    setupFilters(batch);
+
+    await loadPage();
 
     setLoaderProgress(100, "Done!");
+    metaEl.innerHTML = `Scored <code>${escapeHtml(selectedFile.name)}</code> — Rows: <code>${
+      batch.rows
+    }</code>, Valid: <code>${batch.valid}</code>, Approved: <code>${batch.approved}</code>`;
 
     predictBtn.disabled = false;
     setTimeout(hideLoader, 200);
@@ -163,55 +200,143 @@ function renderTable(rows) {
   table.appendChild(tbody);
 }
 
-async function renderPredictedTable(rows) {
-  table.innerHTML = "";
 
-  const headers = rows[0];
-  const visibleIndexes = headers
-    .map((h, i) => (HIDDEN_COLUMNS.includes(h.toLowerCase()) ? -1 : i))
-    .filter(i => i !== -1);
+// ---------- Server-side paging ----------
+
+function setupFilters(meta) {
+  featureFilter.innerHTML = "";
+  const none = document.createElement("option");
+  none.value = "";
+  none.textContent = "Any feature";
+  featureFilter.appendChild(none);
+
+  meta.filterable
+    .filter(c => meta.columns.includes(c))
+    .forEach(c => {
+      const opt = document.createElement("option");
+      opt.value = c;
+      opt.textContent = c;
+      featureFilter.appendChild(opt);
+    });
+
+  decisionFilter.value = "";
+  riskMinInput.value = "";
+  riskMaxInput.value = "";
+  featureMinInput.value = "";
+  featureMaxInput.value = "";
+
+  filtersEl.hidden = false;
+  pagerEl.hidden = false;
+}
+
+function pageParams() {
+  const params = new URLSearchParams({
+    page: query.page,
+    page_size: pageSizeSelect.value,
+    sort: query.sort,
+    order: query.order,
+  });
+
+  if (decisionFilter.value) params.set("decision", decisionFilter.value);
+  if (riskMinInput.value !== "") params.set("risk_percentage_min", riskMinInput.value);
+  if (riskMaxInput.value !== "") params.set("risk_percentage_max", riskMaxInput.value);
+
+  const feature = featureFilter.value;
+  if (feature) {
+    if (featureMinInput.value !== "") params.set(`${feature}_min`, featureMinInput.value);
+    if (featureMaxInput.value !== "") params.set(`${feature}_max`, featureMaxInput.value);
+  }
+  return params;
+}
+
+async function loadPage() {
+  if (!batch) return;
+  errorEl.textContent = "";
+
+  const res = await fetch(`/batches/${batch.batch_id}/rows?${pageParams()}`);
+  if (!res.ok) {
+    const t = await res.text();
+    errorEl.textContent = "Failed to load rows: " + t;
+    return;
+  }
+
+  lastPage = await res.json();
+  renderPredictedPage(lastPage);
+}
 
-  const dataRows = rows.slice(1);
+function renderPredictedPage(data) {
+  table.innerHTML = "";
+
+  const headers = batch.columns.filter(h => !HIDDEN_COLUMNS.includes(h.toLowerCase()));
 
   const thead = document.createElement("thead");
   const tbody = document.createElement("tbody");
-
   const headerTr = document.createElement("tr");
 
-  const thReport = document.createElement("th");
-  thReport.textContent = "Report";
-  headerTr.appendChild(thReport);
+  const columns = [
+    { label: "Report" },
+    { label: "Status", sort: "decision" },
+    { label: "Risk %", sort: "risk_percentage" },
+    ...headers.map(h => ({ label: h, sort: batch.sortable.includes(h) ? h : null })),
+  ];
 
-  visibleIndexes.forEach(i => {
+  columns.forEach(col => {
     const th = document.createElement("th");
-    th.textContent = headers[i];
+    th.textContent = col.label;
+    if (col.sort) {
+      th.classList.add("sortable");
+      if (query.sort === col.sort) th.textContent += query.order === "asc" ? " ▲" : " ▼";
+      th.addEventListener("click", () => {
+        if (query.sort === col.sort) {
+          query.order = query.order === "asc" ? "desc" : "asc";
+        } else {
+          query.sort = col.sort;
+          query.order = "asc";
+        }
+        query.page = 1;
+        loadPage();
+      });
+    }
     headerTr.appendChild(th);
   });
-
   thead.appendChild(headerTr);
 
-  dataRows.forEach((rowArr) => {
+  data.rows.forEach(row => {
     const tr = document.createElement("tr");
 
-    const recordObj = rowToObject(headers, rowArr);
-
     const tdReport = document.createElement("td");
     tdReport.className = "report-link";
+    if (row.ok) {
+      const a = document.createElement("a");
+      a.href = "#";
+      a.textContent = "View PDF";
+      a.addEventListener("click", (ev) => {
+        ev.preventDefault();
+        openRecordTabAsPDF(row.values);
+      });
+      tdReport.appendChild(a);
+    } else {
+      tdReport.textContent = "-";
+    }
+    tr.appendChild(tdReport);
 
-    const a = document.createElement("a");
-    a.href = "#";
-    a.textContent = "View PDF";
-    a.addEventListener("click", (ev) => {
-      ev.preventDefault();
-      openRecordTabAsPDF(recordObj);
-    });
+    const tdStatus = document.createElement("td");
+    if (row.ok) {
+      tdStatus.textContent = row.decision === 1 ? "Approved" : "Rejected";
+      tdStatus.className = row.decision === 1 ? "accepted" : "rejected";
+    } else {
+      tdStatus.textContent = "Invalid";
+      tdStatus.title = row.error || "";
+    }
+    tr.appendChild(tdStatus);
 
-    tdReport.appendChild(a);
-    tr.appendChild(tdReport);
+    const tdRisk = document.createElement("td");
+    tdRisk.textContent = row.risk_percentage == null ? "-" : row.risk_percentage.toFixed(2) + "%";
+    tr.appendChild(tdRisk);
 
-    visibleIndexes.forEach(i => {
+    headers.forEach(h => {
       const td = document.createElement("td");
-      td.textContent = rowArr[i];
+      td.textContent = row.values[h] ?? "";
       tr.appendChild(td);
     });
 
@@ -220,15 +345,43 @@ async function renderPredictedTable(rows) {
 
   table.appendChild(thead);
   table.appendChild(tbody);
+
+  pageInfo.textContent = `Page ${data.page} of ${data.pages} — ${data.total} matching rows`;
+  prevPageBtn.disabled = data.page <= 1;
+  nextPageBtn.disabled = data.page >= data.pages;
 }
 
+applyFiltersBtn.addEventListener("click", () => {
+  query.page = 1;
+  loadPage();
+});
+
+pageSizeSelect.addEventListener("change", () => {
+  query.page = 1;
+  loadPage();
+});
+
+prevPageBtn.addEventListener("click", () => {
+  if (query.page > 1) {
+    query.page -= 1;
+    loadPage();
+  }
+});
 
-function rowToObject(headers, rowArr) {
-  const obj = {};
-  for (let i = 0; i < headers.length; i++) obj[headers[i]] = rowArr[i] ?? "";
-  return obj;
+nextPageBtn.addEventListener("click", () => {
+  if (lastPage && query.page < lastPage.pages) {
+    query.page += 1;
+    loadPage();
+  }
+});
+
+function formatBytes(n) {
+  if (n < 1024) return n + " B";
+  if (n < 1024 * 1024) return (n / 1024).toFixed(1) + " KB";
+  return (n / (1024 * 1024)).toFixed(1) + " MB";
 }
 
+
 // Open new tab with full record details + "Download PDF" (Print -> Save as PDF)
 async function openRecordTabAsPDF(recordObj) {
   const payload = csvRowToPayload(recordObj);
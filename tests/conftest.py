@@ -0,0 +1,54 @@
+# conftest.py file
+#
+# app.py loads artifacts and opens its local stores at import time; keep
+# everything it writes out of the working tree.
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_TMP = tempfile.mkdtemp(prefix="loan-tests-")
+os.environ.setdefault("LOAN_AUDIT", "0")
+os.environ.setdefault("LOAN_REPORT_CACHE", "0")
+os.environ.setdefault("LOAN_SCORE_STORE", "0")
+os.environ.setdefault("LOAN_BATCH_DIR", os.path.join(_TMP, "batches"))
+os.environ.setdefault("LOAN_JOB_DIR", os.path.join(_TMP, "jobs"))
+os.environ.setdefault("LOAN_MONITOR_DIR", os.path.join(_TMP, "monitoring"))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def valid_row():
+    """Row factory: every feature 1 (valid codes), overrides applied."""
+    import app
+
+    def make(**overrides):
+        return {**{name: 1 for name in app.feature_names}, **overrides}
+    return make
+
+
+@pytest.fixture
+def valid_frame(valid_row):
+    """Validated one-row feature frame."""
+    import app
+    return app._validate_rows([valid_row()])[0]
+
+
+@pytest.fixture
+def merge_workers():
+    """merge(make, feed, parts): feed each part to its own instance from
+    make(), then merge every state() - plus an idle worker's - into an
+    empty copy, as the monitoring endpoints do across processes."""
+    def merge(make, feed, parts):
+        merged = make().empty_copy()
+        for part in parts:
+            worker = make()
+            feed(worker, part)
+            merged.merge_state(worker.state())
+        merged.merge_state(make().state())
+        return merged
+    return merge
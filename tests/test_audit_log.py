@@ -0,0 +1,60 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from audit_log import AuditSink, AuditBacklogFull
+
+
+FEATURES = ["a", "b"]
+
+
+def _scores(n):
+    return {"final_prob": np.full(n, 0.7), "decision": np.ones(n, dtype=np.int8)}
+
+
+def _sink(tmp_path, **kwargs):
+    sink = AuditSink(str(tmp_path), FEATURES, flush_interval=3600, **kwargs)
+    # drive flushes from the test, not the background thread
+    sink._ensure_thread = lambda: None
+    return sink
+
+
+def _rows_on_disk(sink):
+    with sqlite3.connect(sink._path) as conn:
+        return conn.execute("SELECT a FROM predictions ORDER BY rowid").fetchall()
+
+
+def test_failed_flush_keeps_rows_in_order(tmp_path, monkeypatch):
+    sink = _sink(tmp_path)
+    sink.record("t", np.array([[1.0, 0.0], [2.0, 0.0]]), _scores(2), 0.5, "v")
+
+    real_write = sink._write_sqlite
+    monkeypatch.setattr(sink, "_write_sqlite", lambda columns: 1 / 0)
+    assert sink.flush() is False
+    assert sink.stats["errors"] == 1
+    assert sink.stats["pending"] == 2
+
+    sink.record("t", np.array([[3.0, 0.0]]), _scores(1), 0.5, "v")
+    monkeypatch.setattr(sink, "_write_sqlite", real_write)
+    assert sink.flush() is True
+
+    assert _rows_on_disk(sink) == [(1.0,), (2.0,), (3.0,)]
+    assert sink.stats["written"] == 3
+    assert sink.stats["pending"] == 0
+    sink.close()
+
+
+def test_full_buffer_blocks_then_fails_the_request(tmp_path, monkeypatch):
+    sink = _sink(tmp_path, max_pending_rows=2, block_timeout=0.05)
+    monkeypatch.setattr(sink, "_write_sqlite", lambda columns: 1 / 0)
+
+    sink.record("t", np.zeros((2, 2)), _scores(2), 0.5, "v")
+    with pytest.raises(AuditBacklogFull):
+        sink.record("t", np.zeros((1, 2)), _scores(1), 0.5, "v")
+    assert sink.stats["rejected"] == 1
+
+    # nothing written at exit -> spilled, not dropped
+    sink.close()
+    assert sink.stats["spilled"] == 2
+    assert list(tmp_path.glob("audit-unwritten-*.npz"))
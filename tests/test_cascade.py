@@ -0,0 +1,41 @@
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize("band", ["abc", "-0.1", "1.5", "nan"])
+def test_invalid_band_is_rejected(monkeypatch, valid_row, band):
+    # the check runs before any model is needed
+    monkeypatch.setattr(app, "baseline_model", object())
+    client = app.app.test_client()
+
+    resp = client.post(f"/predict-batch?tier=cascade&band={band}",
+                       json={"rows": [valid_row()]})
+    assert resp.status_code == 400
+
+
+def test_cascade_shap_skips_the_baseline_explainer(monkeypatch, valid_frame):
+    calls = []
+    monkeypatch.setattr(app, "shap", object())
+    monkeypatch.setattr(app, "baseline_model", object())
+    monkeypatch.setattr(app, "baseline_explainer", object())
+    monkeypatch.setattr(app, "_get_pos_class_shap_matrix",
+                        lambda explainer, X: calls.append(explainer) or (None, None))
+
+    assert app._explain_frame(valid_frame, None, with_baseline=False) == {}
+    assert calls == []
+
+
+def test_baseline_fast_tier_is_counted_by_the_governor(monkeypatch, valid_frame):
+    class Forest:
+        classes_ = app.np.array([0, 1])
+
+        def predict_proba(self, df):
+            return app.np.tile([0.9, 0.1], (len(df), 1))
+
+    monkeypatch.setattr(app, "distilled_model", None)
+    monkeypatch.setattr(app, "baseline_model", Forest())
+
+    calls = app.runtime.stats["scoring_calls"]
+    app._score_frame_cascade(valid_frame, 0.1)
+    assert app.runtime.stats["scoring_calls"] == calls + 1
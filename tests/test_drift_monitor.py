@@ -0,0 +1,30 @@
+import numpy as np
+
+from drift_monitor import DriftMonitor
+
+
+def _monitor():
+    return DriftMonitor(["x", "c"], {"c": {0: "a", 1: "b"}}, threshold=0.5)
+
+
+def test_worker_states_merge_counts_moments_and_quantiles(merge_workers):
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.normal(50, 10, 300), rng.integers(0, 3, 300)])
+    p = rng.random(300)
+
+    single = _monitor()
+    single.update(X, p)
+    merged = merge_workers(_monitor, lambda m, part: m.update(X[part], p[part]),
+                           (slice(0, 120), slice(120, 300)))
+
+    a, b = single.snapshot(), merged.snapshot()
+    assert a["rows"] == b["rows"] == 300
+    # category counts, and the code 2 outside the domain as "unknown"
+    assert a["features"]["c"] == b["features"]["c"]
+    # the probability histogram and approval counts around the threshold
+    assert a["final_prob"] == b["final_prob"]
+    # min/max and histogram quantiles are exact, moments via the Chan merge
+    for key in ("count", "min", "max", "p50"):
+        assert a["features"]["x"][key] == b["features"]["x"][key]
+    assert np.isclose(a["features"]["x"]["mean"], b["features"]["x"]["mean"])
+    assert np.isclose(a["features"]["x"]["std"], b["features"]["x"]["std"])
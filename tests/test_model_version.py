@@ -0,0 +1,19 @@
+import os
+
+import app
+
+
+def test_swapping_only_the_baseline_changes_the_version(tmp_path, monkeypatch):
+    baseline = tmp_path / "baseline_rf_artifact.pkl"
+    baseline.write_bytes(b"old forest")
+    monkeypatch.setattr(app, "BASELINE_ARTIFACT_PATH", str(baseline))
+    enhanced = {"model_version": "2024-06"}
+
+    before = app._model_version(enhanced, None)
+    baseline.write_bytes(b"retrained forest")
+    os.utime(baseline, (1_700_000_000, 1_700_000_000))
+    assert app._model_version(enhanced, None) != before
+
+    # explicit baseline versions count as well
+    assert (app._model_version(enhanced, {"model_version": "b1"})
+            != app._model_version(enhanced, {"model_version": "b2"}))
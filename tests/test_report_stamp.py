@@ -0,0 +1,44 @@
+import re
+from datetime import datetime
+
+import app
+
+
+def test_stamped_pdf_has_real_dates_and_unique_id(valid_row):
+    template, _ = app._build_pdf_bytes({}, valid_row(), template=True)
+    now = datetime(2026, 5, 19, 14, 30, tzinfo=app.REPORT_TZ)
+
+    first = app._stamp_pdf(template, now)
+    second = app._stamp_pdf(template, now)
+
+    assert len(first) == len(template)
+    assert b"D:20000101000000" not in first
+    assert first.count(b"(D:20260519143000+08'00')") == 2
+    assert b"19 / 05 / 2026" in first and b"14:30" in first
+
+    ids = [re.search(rb"/ID\s*\[<([0-9a-f]{32})>", pdf).group(1) for pdf in (template, first, second)]
+    assert len(set(ids)) == 3
+
+
+def test_cached_report_streams_the_same_pdf(tmp_path, monkeypatch, valid_row):
+    monkeypatch.setattr(app, "report_cache", app.ReportCache(str(tmp_path)))
+    row = valid_row()
+
+    miss, _ = app._render_report(row, source="report")
+    with miss:
+        first = miss.read()
+    hit, now = app._render_report(row, source="report")
+    assert isinstance(hit, app.PatchedReader)
+    with hit:
+        # small reads exercise patches that straddle chunk boundaries
+        second = b"".join(iter(lambda: hit.read(7), b""))
+
+    assert app.report_cache.stats["hits"] == 1
+    assert len(first) == len(second)
+    assert now.strftime("%d / %m / %Y").encode() in second
+    assert b"D:20000101000000" not in first + second
+
+    # same report apart from the per-download /ID (and possibly the minute)
+    id_first = re.search(rb"/ID\s*\[<([0-9a-f]{32})>", first).group(1)
+    id_second = re.search(rb"/ID\s*\[<([0-9a-f]{32})>", second).group(1)
+    assert id_first != id_second
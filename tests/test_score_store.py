@@ -0,0 +1,55 @@
+import numpy as np
+
+import app
+from score_store import ScoreStore
+
+
+def _store_with_two_versions(tmp_path):
+    store = ScoreStore(str(tmp_path / "scores.sqlite"))
+    scores = {"final_prob": np.array([0.2]), "decision": np.array([0])}
+    store.put("old", [1], scores)
+    store.put(app.MODEL_VERSION, [2], scores)
+    return store
+
+
+def test_purge_is_refused_without_models(tmp_path, monkeypatch):
+    store = _store_with_two_versions(tmp_path)
+    monkeypatch.setattr(app, "artifact", None)
+
+    assert app._purge_score_store(store) == 0
+    assert store.count() == 2
+
+
+def test_purge_closes_the_connection(tmp_path, monkeypatch):
+    store = _store_with_two_versions(tmp_path)
+    monkeypatch.setattr(app, "artifact", {})
+    monkeypatch.setattr(app, "baseline_model", object())
+
+    assert app._purge_score_store(store) == 1
+    assert store._conn is None
+    assert store.count() == 1
+
+
+def test_unscored_rows_are_not_stored(tmp_path, monkeypatch, valid_frame):
+    store = ScoreStore(str(tmp_path / "scores.sqlite"))
+    monkeypatch.setattr(app, "score_store", store)
+    monkeypatch.setattr(app, "artifact", None)
+    monkeypatch.setattr(app, "baseline_model", None)
+
+    scores, _, rescored = app._score_frame_incremental(valid_frame)
+    assert scores == {} and rescored.all()
+    assert store.count() == 0
+
+
+def test_stored_rows_missing_a_loaded_model_are_rescored(tmp_path, monkeypatch, valid_frame):
+    store = ScoreStore(str(tmp_path / "scores.sqlite"))
+    store.put(app.MODEL_VERSION, app.row_fingerprints(valid_frame), {})
+    monkeypatch.setattr(app, "score_store", store)
+    monkeypatch.setattr(app, "baseline_model", object())
+    monkeypatch.setattr(app, "_score_frame", lambda d: (
+        {"baseline_prob": app.np.array([0.3]),
+         "baseline_decision": app.np.array([0])}, None))
+
+    scores, _, rescored = app._score_frame_incremental(valid_frame)
+    assert rescored.all()
+    assert scores["baseline_prob"].tolist() == [0.3]
@@ -0,0 +1,41 @@
+import numpy as np
+
+from shap_summary import ShapAggregator
+
+
+def test_worker_states_merge_impact_and_driver_statistics(merge_workers):
+    rng = np.random.default_rng(1)
+    # feature "a" dominates most rows, so the top-driver rates differ
+    V = rng.normal(size=(200, 4)) * [3.0, 1.0, 1.0, 0.5]
+
+    single = ShapAggregator(list("abcd"))
+    single.update("enhanced", V)
+    merged = merge_workers(lambda: ShapAggregator(list("abcd")),
+                           lambda agg, part: agg.update("enhanced", part),
+                           (V[:70], V[70:]))
+
+    a = single.snapshot()["explainers"]["enhanced"]
+    b = merged.snapshot()["explainers"]["enhanced"]
+    assert a["rows"] == b["rows"] == 200
+    assert [f["feature"] for f in b["features"]][0] == "a"
+    for fa, fb in zip(a["features"], b["features"]):
+        assert fa["feature"] == fb["feature"]
+        for key in ("impact_histogram", "impact_p50", "impact_p90",
+                    "top_driver_rate", "positive_rate"):
+            assert fa[key] == fb[key]
+        for key in ("mean_abs_contribution", "share_percent", "std_contribution"):
+            assert np.isclose(fa[key], fb[key])
+
+
+def test_json_batches_feed_a_bounded_sample(monkeypatch, valid_row):
+    import app
+
+    explained = []
+    monkeypatch.setattr(app, "SHAP_SAMPLE_ROWS", 5)
+    monkeypatch.setattr(app, "_explain_frame",
+                        lambda df, df_hybrid: explained.append(len(df)))
+    rows = [valid_row(age=20 + i) for i in range(12)]
+
+    resp = app.app.test_client().post("/predict-batch", json={"rows": rows})
+    assert resp.status_code == 200
+    assert explained == [5]
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+import time
+
+from shared_state import StatePublisher
+
+
+def _seed(directory, name, age=0.0):
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{}")
+    if age:
+        t = time.time() - age
+        os.utime(path, (t, t))
+    return path
+
+
+def test_only_files_of_exited_or_old_processes_are_removed(tmp_path):
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+
+    live = _seed(tmp_path, f"drift-other-{os.getpid()}.json")
+    dead = _seed(tmp_path, f"drift-other-{exited.pid}.json")
+    old = _seed(tmp_path, f"drift-older-{os.getpid()}.json", age=7200)
+    other_kind = _seed(tmp_path, f"shap-older-{exited.pid}.json")
+
+    StatePublisher(str(tmp_path), "drift", "current", dict, stale_after=3600)
+
+    assert os.path.exists(live)
+    assert not os.path.exists(dead)
+    assert not os.path.exists(old)
+    assert os.path.exists(other_kind)
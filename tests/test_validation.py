@@ -0,0 +1,23 @@
+import app
+
+
+def test_non_scalar_categorical_cell_only_rejects_its_row(valid_row):
+    rows = [valid_row(), valid_row(job=[1]), valid_row(marital={"a": 1}),
+            valid_row(job="management")]
+
+    df, ok, errors = app._validate_rows(rows)
+
+    assert ok.tolist() == [True, False, False, True]
+    assert errors[1] == "Invalid values for: job"
+    assert errors[2] == "Invalid values for: marital"
+    assert df.loc[3, "job"] == 4.0
+
+
+def test_non_scalar_cell_in_batch_request_is_a_row_error(valid_row):
+    client = app.app.test_client()
+    resp = client.post("/predict-batch", json={"rows": [valid_row(), valid_row(job=[1])]})
+
+    assert resp.status_code == 200
+    results = resp.get_json()["results"]
+    assert results[0]["ok"] is True
+    assert results[1] == {"ok": False, "error": "Invalid values for: job"}
@@ -0,0 +1,43 @@
+import numpy as np
+
+import app
+
+
+def _brute_force(P, thresholds):
+    return (P[:, :, None] >= thresholds[None, None, :]).sum(axis=1)
+
+
+def test_grid_counts_matches_brute_force_at_the_threshold():
+    ulp = np.spacing(0.5)
+    P = np.array([[0.5 - 4 * ulp, 0.7], [0.5 - 4 * ulp, 0.2], [0.5 - 1e-16, 0.1]])
+    t = np.array([0.5])
+
+    assert app._grid_counts(P, t).ravel().tolist() == [1, 0, 0]
+    assert (app._grid_counts(P, t) == _brute_force(P, t)).all()
+
+
+def test_grid_counts_matches_brute_force_on_random_grids():
+    rng = np.random.default_rng(2)
+    P = rng.random((25, 400))
+    P[:, :50] = 0.5  # ties at a threshold
+    thresholds = np.unique(np.concatenate([rng.random(30), [0.0, 0.5, 1.0]]))
+
+    assert (app._grid_counts(P, thresholds) == _brute_force(P, thresholds)).all()
+
+
+def test_what_if_rejects_non_numeric_thresholds(monkeypatch):
+    job = {
+        "rf_prob": np.array([0.4, 0.6]),
+        "xgb_prob": np.array([0.5, 0.7]),
+        "decision": np.array([0, 1]),
+        "meta": {"threshold": 0.5, "blend_weight": 0.5, "model_version": "t"},
+    }
+    monkeypatch.setattr(app, "_load_batch_job", lambda job_id: job)
+    client = app.app.test_client()
+
+    resp = client.post("/what-if", json={"job_id": "ab", "thresholds": ["abc"]})
+    assert resp.status_code == 400
+
+    resp = client.post("/what-if", json={"job_id": "ab", "thresholds": [0.4, 0.6]})
+    assert resp.status_code == 200
+    assert [g["approved"] for g in resp.get_json()["grid"]] == [2, 1]